@@ -7,10 +7,91 @@ class Settings(BaseSettings):
     PINECONE_API_KEY: str
     PINECONE_ENVIRONMENT: str = "gcp-starter"
     PINECONE_INDEX_NAME: str = "lexicase-legal"
+    VECTOR_STORE_BACKEND: str = "pinecone"  # pinecone, local
+    LOCAL_VECTOR_STORE_DIR: str = "data/vector_store"
+    VECTOR_NAMESPACE_PER_CASE: bool = False  # One namespace per case; run scripts.migrate_namespaces when enabling
+    VECTOR_UPSERT_BATCH_SIZE: int = 100  # Pinecone best practice
+    VECTOR_UPSERT_CONCURRENCY: int = 4  # Batches in flight at once
+    VECTOR_UPSERT_MAX_RETRIES: int = 3
+    VECTOR_UPSERT_RETRY_BASE_DELAY: float = 0.5  # Seconds; doubled per attempt, with full jitter
     SECRET_KEY: str
     DATABASE_URL: str = "sqlite:///./lexicase.db"
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
+    WARM_UP_ON_STARTUP: bool = True  # Load models/connect to services in the background at startup
+    
+    # Embedding Settings
+    EMBEDDING_BACKEND: str = "torch"  # torch, onnx (ONNX Runtime; needs optimum[onnxruntime])
+    EMBEDDING_ONNX_QUANTIZE: bool = True  # int8 dynamic quantization for the onnx backend
+    EMBEDDING_ONNX_QUANTIZATION: str = "avx512_vnni"  # arm64, avx2, avx512, avx512_vnni
+    EMBEDDING_ONNX_EXPORT_DIR: str = "data/onnx_models"
+    EMBEDDING_BATCH_SIZE: int = 32  # Texts per SentenceTransformer.encode call
+    EMBEDDING_WORKERS: int = 1  # Embedding/chunking threads (PyTorch already parallelizes each encode)
+    EMBEDDING_QUEUE_SIZE: int = 64  # Max queued bulk embedding batches before ingestion waits
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000  # ~1.6KB per MiniLM embedding on disk
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024  # In-memory LRU of chat query embeddings
+    INCREMENTAL_INDEXING: bool = True  # Only re-embed chunks whose content hash changed
+    CHUNK_SIZE: int = 1000  # Max characters per chunk
+    CHUNK_OVERLAP: int = 200  # Characters shared by neighbouring chunks
+    CHUNK_METADATA_HEADER: bool = True  # Prefix embedded chunks with title/case number (embeddings then depend on the title)
+    NEAR_DUPLICATE_MODE: str = "alias"  # off, alias (point at the existing vector), skip (drop the chunk)
+    NEAR_DUPLICATE_THRESHOLD: float = 0.9  # Estimated Jaccard similarity of 5-word shingles
+    NEAR_DUPLICATE_INDEX_PATH: str = "data/near_duplicates.sqlite3"
+    
+    # LLM Settings
+    GEMINI_REQUEST_TIMEOUT_SECONDS: float = 120.0  # Per Gemini call; the call is cancelled when exceeded
+    GEMINI_MAX_CONCURRENT_REQUESTS: int = 8  # Gemini calls in flight at once per worker
+    
+    # Analysis Settings
+    ANALYSIS_CACHE_ENABLED: bool = True  # Reuse LLM analyses of identical transcripts
+    ANALYSIS_CACHE_PATH: str = "data/analysis_cache.sqlite3"
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 5000
+    ANALYSIS_CACHE_TTL_SECONDS: int = 30 * 24 * 3600  # 30 days
+    ANALYSIS_MAP_REDUCE_THRESHOLD_CHARS: int = 60_000  # Longer transcripts are analyzed in segments
+    ANALYSIS_SEGMENT_CHARS: int = 30_000
+    ANALYSIS_SEGMENT_OVERLAP: int = 1_000
+    ANALYSIS_MAX_CONCURRENCY: int = 4  # Segment LLM calls in flight at once
+    
+    # Retrieval Settings
+    LEXICAL_INDEX_ENABLED: bool = True  # SQLite FTS5 (BM25) index for hybrid search
+    LEXICAL_INDEX_PATH: str = "data/lexical_index.sqlite3"
+    CHAT_SEARCH_MODE: str = "hybrid"  # dense, lexical, hybrid
+    HYBRID_RRF_K: int = 60  # Reciprocal rank fusion constant
+    SEARCH_OVERSAMPLE_FACTOR: int = 3  # Chunks fetched per requested result, before grouping
+    SEARCH_BATCH_MAX_QUERIES: int = 100  # Queries accepted per /api/search/batch request
+    SEARCH_BATCH_CONCURRENCY: int = 8  # Searches of one batch run at the same time
+    CHUNK_STORE_PATH: str = "data/chunk_store.sqlite3"  # Full chunk text, hydrated into search results
+    CHUNK_STORE_COMPRESSION_LEVEL: int = 6  # zlib level
+    
+    # Chat Context Settings
+    CHAT_PROMPT_TOKEN_BUDGET: int = 8000  # System prompt, case context, history and message of one chat turn
+    CHAT_CHARS_PER_TOKEN: float = 4.0  # For estimating token counts
+    CHAT_CONTEXT_CHUNKS: int = 3  # Retrieved results offered to the context assembler
+    
+    # Chat Session Settings
+    CHAT_SESSION_BACKEND: str = "memory"  # memory (per worker), sqlite (workers on one host), redis (any host)
+    CHAT_SESSION_SQLITE_PATH: str = "data/chat_sessions.sqlite3"
+    CHAT_SESSION_REDIS_URL: str = "redis://localhost:6379/0"  # Needs the redis package
+    CHAT_SESSION_MAX_ENTRIES: int = 1000  # Sessions kept (memory: per worker); least recently used evicted
+    CHAT_SESSION_TTL_SECONDS: int = 3600  # Sessions idle this long are evicted; they rehydrate from chat_history
+    CHAT_SESSION_MAX_BYTES: int = 64 * 1024 * 1024  # memory backend: approximate text held; 0 disables
+    CHAT_SESSION_HISTORY_MESSAGES: int = 20  # Messages of history kept per session
+    CHAT_SUMMARY_ENABLED: bool = True  # Fold older turns into a running per-session summary in the background
+    CHAT_SUMMARY_TRIGGER_MESSAGES: int = 12  # Summarize once a session holds more messages than this
+    CHAT_SUMMARY_KEEP_MESSAGES: int = 6  # Most recent messages kept verbatim after summarizing
+    CHAT_SUMMARY_MAX_CHARS: int = 2000
+    
+    # Tool Settings
+    TOOL_TIMEOUT_SECONDS: float = 15.0  # Default limit for one tool call; per-tool settings below override it
+    WEB_SEARCH_BACKEND: str = "duckduckgo"  # duckduckgo, local (offline stand-in for tests and load tests)
+    WEB_SEARCH_MAX_RESULTS: int = 5
+    WEB_SEARCH_TIMEOUT_SECONDS: float = 10.0
+    WEB_SEARCH_CACHE_TTL_SECONDS: int = 3600  # Identical queries within this window reuse the results
+    WEB_SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    WEB_SEARCH_LOCAL_FIXTURES: str = ""  # local backend: JSON list of {title, snippet, link}; empty makes results up
+    WEB_SEARCH_LOCAL_LATENCY_MS: int = 0  # local backend: simulated search latency
     
     # Mailtrap Email Settings
     MAILTRAP_TOKEN: str = ""
@@ -1,10 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 from database import engine, Base
-from routers import cases, meetings, chat, dashboard, action_items, email, case_documents, calendar
+from config import get_settings
+from routers import cases, meetings, chat, dashboard, action_items, email, case_documents, calendar, search
+from services.lifecycle import open_exclusive_stores, warm_up_services, service_readiness, service_metrics
+import asyncio
 import os
 
+settings = get_settings()
+
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
@@ -12,10 +19,29 @@ Base.metadata.create_all(bind=engine)
 os.makedirs("uploads", exist_ok=True)
 os.makedirs("uploads/documents", exist_ok=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fails the startup if another worker already holds the local vector store
+    await asyncio.to_thread(open_exclusive_stores)
+    
+    # Load the embedding model and connect to external services in the background
+    # so the worker starts serving immediately; /ready reports when they are up
+    warm_up_task = None
+    if settings.WARM_UP_ON_STARTUP:
+        warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up_services))
+    
+    yield
+    
+    if warm_up_task and not warm_up_task.done():
+        warm_up_task.cancel()
+
+
 app = FastAPI(
     title="Lexicase API",
     description="AI-Powered Court Hearing and Client Assistant",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Mount static files for uploads
@@ -39,6 +65,7 @@ app.include_router(action_items.router)
 app.include_router(email.router)
 app.include_router(case_documents.router)
 app.include_router(calendar.router)
+app.include_router(search.router)
 
 
 @app.get("/")
@@ -55,6 +82,23 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once heavy services are initialized, 503 until then"""
+    services = service_readiness()
+    ready = all(services.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "starting", "services": services}
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime statistics for caches and services in this worker"""
+    return service_metrics()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
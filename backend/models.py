@@ -171,3 +171,24 @@ class Task(Base):
     
     case = relationship("Case")
     calendar_event = relationship("CalendarEvent", back_populates="tasks")
+
+
+class VectorChunk(Base):
+    """Manifest of every vector stored for a meeting or case document"""
+    __tablename__ = "vector_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vector_id = Column(String, unique=True, index=True)
+    owner_type = Column(String, index=True)  # meeting, document
+    owner_id = Column(Integer, index=True)
+    case_id = Column(Integer, index=True)
+    chunk_type = Column(String)  # transcript_chunk, insights_summary, case_document
+    chunk_index = Column(Integer, nullable=True)
+    start_offset = Column(Integer, nullable=True)  # character offsets into the source text
+    end_offset = Column(Integer, nullable=True)
+    chunk_length = Column(Integer, nullable=True)
+    content_hash = Column(String)  # sha256 of the chunk text and its metadata header
+    alias_of = Column(String, nullable=True, index=True)  # canonical vector of a near-duplicate chunk (no vector of its own)
+    preview = Column(String, nullable=True)  # first 100 characters of the chunk
+    extra_data = Column(JSON, nullable=True)  # e.g. insights_count for summary vectors
+    created_at = Column(DateTime, default=datetime.utcnow)
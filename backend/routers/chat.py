@@ -1,100 +1,149 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal
 from models import ChatHistory, Case, Meeting, Insight, ActionItem
 from schemas import ChatMessage, ChatResponse
 from services.langchain_gemini_service import langchain_gemini_service  # New LangChain service
 from services.pinecone_service import pinecone_service
+from services.context_assembler import ContextAssembler
+from config import get_settings
+from typing import Any, Dict, List, Optional
+import json
 import uuid
 from datetime import datetime
 
+settings = get_settings()
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
 
-@router.post("/", response_model=ChatResponse)
-async def chat(message: ChatMessage, db: Session = Depends(get_db)):
-    """Chat with the AI assistant about cases and meetings"""
+async def build_chat_context(message: ChatMessage, db: Session):
+    """Case details, insights, action items and relevant indexed content for a chat message.
     
-    # Generate or use existing session ID
-    session_id = message.session_id or str(uuid.uuid4())
-    
-    # Build context from case if provided
-    context = ""
-    sources = []
+    Returns a ContextAssembler offering each kind of material by priority
+    (retrieved content, critical insights, pending items, then meetings); the
+    chat service fits it to the prompt budget, after which ``context.sources``
+    lists the retrieved content that made it into the prompt.
+    """
+    context = ContextAssembler()
     
     if message.case_id:
         case = db.query(Case).filter(Case.id == message.case_id).first()
         if case:
             # Get case details
-            context += f"Case Number: {case.case_number}\n"
-            context += f"Case Title: {case.title}\n"
-            context += f"Status: {case.status}\n\n"
+            context.add("case", [
+                f"Case Number: {case.case_number}",
+                f"Case Title: {case.title}",
+                f"Status: {case.status}"
+            ], required=True)
             
             # Get meetings
             meetings = db.query(Meeting).filter(Meeting.case_id == message.case_id).all()
-            if meetings:
-                context += "Recent Meetings:\n"
-                for meeting in meetings[-3:]:  # Last 3 meetings
-                    context += f"- {meeting.title} ({meeting.meeting_date})\n"
-                    if meeting.summary:
-                        context += f"  Summary: {meeting.summary[:200]}...\n"
-                context += "\n"
+            context.add("recent_meetings", [
+                f"- {meeting.title} ({meeting.meeting_date})"
+                + (f"\n  Summary: {meeting.summary[:200]}..." if meeting.summary else "")
+                for meeting in meetings[-3:]  # Last 3 meetings
+            ], heading="Recent Meetings:", priority=4)
             
             # Get critical insights
             critical_insights = db.query(Insight).join(Meeting).filter(
                 Meeting.case_id == message.case_id,
                 Insight.severity.in_(["high", "critical"])
             ).limit(5).all()
-            
-            if critical_insights:
-                context += "Critical Insights:\n"
-                for insight in critical_insights:
-                    context += f"- {insight.title}: {insight.description}\n"
-                context += "\n"
+            context.add("critical_insights", [
+                f"- {insight.title}: {insight.description}" for insight in critical_insights
+            ], heading="Critical Insights:", priority=2)
             
             # Get pending action items
             action_items = db.query(ActionItem).filter(
                 ActionItem.case_id == message.case_id,
                 ActionItem.status == "pending"
             ).limit(5).all()
-            
-            if action_items:
-                context += "Pending Action Items:\n"
-                for item in action_items:
-                    context += f"- {item.title} (Priority: {item.priority})\n"
-                context += "\n"
+            context.add("pending_action_items", [
+                f"- {item.title} (Priority: {item.priority})" for item in action_items
+            ], heading="Pending Action Items:", priority=3)
         
-        # Search Pinecone for relevant content
+        # Search the vector store (and full-text index) for relevant content
         similar_content = await pinecone_service.search_similar_content(
             query=message.message,
             case_id=message.case_id,
-            top_k=3
+            top_k=settings.CHAT_CONTEXT_CHUNKS,
+            mode=settings.CHAT_SEARCH_MODE
         )
         
         if similar_content:
-            context += "Relevant Case Information:\n"
-            for content in similar_content:
-                context += f"- {content['content']}...\n"
-                # Add source with proper identification
-                metadata = content.get('metadata', {})
-                content_type = metadata.get('type', 'unknown')
-                if content_type == 'case_document':
-                    doc_id = metadata.get('document_id')
-                    doc_title = metadata.get('title', 'Document')  # Fixed: metadata uses 'title' not 'document_title'
-                    if doc_id:
-                        sources.append(f"Case Document: {doc_title} (ID: {doc_id})")
-                elif content_type == 'transcript_chunk':
-                    meeting_id = metadata.get('meeting_id')
-                    if meeting_id:
-                        sources.append(f"Meeting Transcript (ID: {meeting_id})")
-                else:
-                    # Fallback for older data
-                    meeting_id = metadata.get('meeting_id')
-                    if meeting_id:
-                        sources.append(f"Meeting (ID: {meeting_id})")
+            context.add("relevant_content", [
+                f"- {content['content']}..." for content in similar_content
+            ], heading="Relevant Case Information:", priority=1, sources=[
+                content_source(content) for content in similar_content
+            ])
+    
+    return context
+
+
+def content_source(content: Dict[str, Any]) -> Optional[str]:
+    """Label identifying where a retrieved chunk came from"""
+    metadata = content.get('metadata', {})
+    content_type = metadata.get('type', 'unknown')
+    if content_type == 'case_document':
+        doc_id = metadata.get('document_id')
+        doc_title = metadata.get('title', 'Document')  # Fixed: metadata uses 'title' not 'document_title'
+        if doc_id:
+            return f"Case Document: {doc_title} (ID: {doc_id})"
+    elif content_type == 'transcript_chunk':
+        meeting_id = metadata.get('meeting_id')
+        if meeting_id:
+            return f"Meeting Transcript (ID: {meeting_id})"
+    else:
+        # Fallback for older data
+        meeting_id = metadata.get('meeting_id')
+        if meeting_id:
+            return f"Meeting (ID: {meeting_id})"
+    return None
+
+
+def save_chat_turn(
+    db: Session,
+    session_id: str,
+    message: ChatMessage,
+    response_text: str,
+    sources: List[str],
+    context_report: Optional[Dict[str, Any]] = None
+):
+    """Persist one question/answer exchange to the chat history"""
+    context_used = {}
+    if sources:
+        context_used["sources"] = sources
+    if context_report:
+        # What the context assembler included and dropped for this turn
+        context_used["context"] = context_report
+    chat_record = ChatHistory(
+        session_id=session_id,
+        case_id=message.case_id,
+        user_message=message.message,
+        bot_response=response_text,
+        context_used=context_used or None
+    )
+    db.add(chat_record)
+    db.commit()
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/", response_model=ChatResponse)
+async def chat(message: ChatMessage, db: Session = Depends(get_db)):
+    """Chat with the AI assistant about cases and meetings"""
+    
+    # Generate or use existing session ID
+    session_id = message.session_id or str(uuid.uuid4())
+    
+    # Build context from case if provided
+    context = await build_chat_context(message, db)
     
     # Use LangChain Gemini service with tool calling
-    print(f"[Chat] Context length: {len(context)} chars", flush=True)
     print(f"[Chat] Web search enabled: {message.web_search}", flush=True)
     
     result = await langchain_gemini_service.chat_with_tools(
@@ -111,20 +160,13 @@ async def chat(message: ChatMessage, db: Session = Depends(get_db)):
     if not isinstance(response_text, str):
         response_text = str(response_text)
     
-    # Combine sources from Pinecone and web search
+    # Combine the retrieved content that fit in the prompt with web search sources
+    sources = context.sources
     if web_sources:
         sources.extend(web_sources)
     
     # Save to chat history
-    chat_record = ChatHistory(
-        session_id=session_id,
-        case_id=message.case_id,
-        user_message=message.message,
-        bot_response=response_text,  # Now guaranteed to be a string
-        context_used={"sources": sources} if sources else None
-    )
-    db.add(chat_record)
-    db.commit()
+    save_chat_turn(db, session_id, message, response_text, sources, result.get("context"))
     
     return ChatResponse(
         response=response_text,
@@ -133,6 +175,66 @@ async def chat(message: ChatMessage, db: Session = Depends(get_db)):
     )
 
 
+@router.post("/stream")
+async def chat_stream(message: ChatMessage):
+    """Chat with the AI assistant, streaming the answer as server-sent events
+    
+    Events, in order: session, sources (case material used as context),
+    context (what fit in the prompt budget and what was dropped), then token
+    events as the answer is generated, interleaved with tool_start / tool_end
+    around web searches, and finally done (or error). The exchange is saved
+    to the chat history once the answer is complete.
+    """
+    session_id = message.session_id or str(uuid.uuid4())
+    
+    async def events():
+        # The request-scoped session is closed before a streaming body runs, so use our own
+        db = SessionLocal()
+        try:
+            yield sse_event("session", {"session_id": session_id})
+            
+            context = await build_chat_context(message, db)
+            
+            print(f"[Chat] Web search enabled: {message.web_search}", flush=True)
+            
+            sources = []
+            context_report = None
+            async for item in langchain_gemini_service.stream_chat_with_tools(
+                message=message.message,
+                case_context=context,
+                session_id=session_id,
+                web_search_enabled=message.web_search
+            ):
+                if item["event"] == "context":
+                    # The prompt is assembled now, so we know which retrieved content it kept
+                    sources = context.sources
+                    yield sse_event("sources", {"sources": sources})
+                    context_report = item["data"]
+                if item["event"] != "done":
+                    yield sse_event(item["event"], item["data"])
+                    continue
+                
+                sources.extend(item["data"].get("sources") or [])
+                save_chat_turn(db, session_id, message, item["data"]["response"], sources, context_report)
+                yield sse_event("done", {
+                    "response": item["data"]["response"],
+                    "sources": sources if sources else None,
+                    "session_id": session_id
+                })
+        except Exception as e:
+            print(f"[Chat] Streaming error: {e}", flush=True)
+            yield sse_event("error", {"message": f"I apologize, but I encountered an error: {str(e)}"})
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/history/{session_id}")
 async def get_chat_history(session_id: str, db: Session = Depends(get_db)):
     """Get chat history for a session"""
@@ -208,4 +310,5 @@ async def delete_chat_session(session_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Chat session not found")
     
     db.commit()
+    langchain_gemini_service.clear_chat_history(session_id)
     return {"message": f"Deleted chat session with {deleted} messages"}
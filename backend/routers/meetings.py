@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from database import get_db
 from models import Meeting, Case, Insight, ActionItem
-from schemas import MeetingResponse, InsightResponse, ActionItemResponse
+from schemas import MeetingResponse, MeetingTranscriptUpdate, InsightResponse, ActionItemResponse
 from services.langchain_gemini_service import langchain_gemini_service  # Updated to LangChain service
 from services.pinecone_service import pinecone_service
 import os
@@ -183,6 +183,53 @@ async def get_meeting_action_items(meeting_id: int, db: Session = Depends(get_db
     return action_items
 
 
+@router.get("/{meeting_id}/chunks")
+async def get_meeting_chunks(meeting_id: int, db: Session = Depends(get_db)):
+    """Get how a meeting's transcript was chunked and indexed"""
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    
+    return await pinecone_service.get_meeting_chunks_info(meeting_id)
+
+
+@router.put("/{meeting_id}/transcript", response_model=MeetingResponse)
+async def update_meeting_transcript(
+    meeting_id: int,
+    transcript_update: MeetingTranscriptUpdate,
+    db: Session = Depends(get_db)
+):
+    """Correct a meeting transcript and re-index only the chunks that changed"""
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    
+    meeting.transcript = transcript_update.transcript
+    db.commit()
+    db.refresh(meeting)
+    
+    insights = db.query(Insight).filter(Insight.meeting_id == meeting_id).all()
+    
+    # Re-store in the vector store; unchanged chunks are skipped by content hash
+    await pinecone_service.store_meeting_content(
+        meeting_id=meeting.id,
+        case_id=meeting.case_id,
+        transcript=meeting.transcript,
+        insights=[
+            {
+                "type": insight.type,
+                "title": insight.title,
+                "description": insight.description,
+                "severity": insight.severity
+            }
+            for insight in insights
+        ],
+        metadata={"case_number": meeting.case.case_number, "title": meeting.title}
+    )
+    
+    return meeting
+
+
 @router.delete("/{meeting_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_meeting(meeting_id: int, db: Session = Depends(get_db)):
     """Delete a meeting and all associated data including insights, action items, and Pinecone vectors"""
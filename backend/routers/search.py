@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from database import get_db
+from models import Case
+from schemas import BatchSearchRequest, BatchSearchResponse
+from services.pinecone_service import pinecone_service
+from config import get_settings
+
+settings = get_settings()
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+SEARCH_MODES = ("dense", "lexical", "hybrid")
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def batch_search(request: BatchSearchRequest, db: Session = Depends(get_db)):
+    """Run many retrieval queries (e.g. an issue checklist) against a case in one call"""
+    queries = [query.strip() for query in request.queries]
+    if not queries or not all(queries):
+        raise HTTPException(status_code=400, detail="Queries must be non-empty")
+    if len(queries) > settings.SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.SEARCH_BATCH_MAX_QUERIES} queries per request"
+        )
+    if not 1 <= request.top_k <= 50:
+        raise HTTPException(status_code=400, detail="top_k must be between 1 and 50")
+    
+    mode = request.mode or settings.CHAT_SEARCH_MODE
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
+    
+    if request.case_id:
+        case = db.query(Case).filter(Case.id == request.case_id).first()
+        if not case:
+            raise HTTPException(status_code=404, detail="Case not found")
+    
+    results = await pinecone_service.search_many(
+        queries,
+        case_id=request.case_id,
+        top_k=request.top_k,
+        mode=mode
+    )
+    return {"results": results}
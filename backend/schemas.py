@@ -55,6 +55,10 @@ class MeetingResponse(MeetingBase):
         from_attributes = True
 
 
+class MeetingTranscriptUpdate(BaseModel):
+    transcript: str
+
+
 class InsightBase(BaseModel):
     type: str
     title: str
@@ -124,6 +128,22 @@ class ChatResponse(BaseModel):
     session_id: str
 
 
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    case_id: Optional[int] = None
+    top_k: int = 5
+    mode: Optional[str] = None  # dense, lexical, hybrid (defaults to CHAT_SEARCH_MODE)
+
+
+class QuerySearchResults(BaseModel):
+    query: str
+    results: List[Dict[str, Any]]
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[QuerySearchResults]
+
+
 class CaseStatistics(BaseModel):
     total_cases: int
     active_cases: int
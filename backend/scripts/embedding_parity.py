@@ -0,0 +1,70 @@
+"""
+Compare the configured embedding backend (EMBEDDING_BACKEND=onnx, optionally
+int8-quantized) against the PyTorch reference: throughput and embedding parity.
+
+Usage (from the backend directory):
+    EMBEDDING_BACKEND=onnx python -m scripts.embedding_parity [--texts-file FILE] [--limit N] [--output report.json]
+
+Without --texts-file, sample texts are taken from chunks already stored in
+the lexical index, falling back to a few built-in legal sentences.
+"""
+import argparse
+import json
+import os
+import sqlite3
+
+from config import get_settings
+from services.embedding_backends import compare_backends
+
+settings = get_settings()
+
+SAMPLE_TEXTS = [
+    "The court granted the motion for summary judgment on the breach of contract claim.",
+    "Defense counsel objected to the admission of Exhibit 14 as hearsay.",
+    "The parties shall complete expert discovery no later than March 15.",
+    "Plaintiff seeks damages under 42 U.S.C. § 1983 for the alleged unlawful search.",
+    "The judge continued the hearing to allow the defendant to retain new counsel.",
+    "Motion to dismiss under Rule 12(b)(6) for failure to state a claim is denied.",
+    "The witness testified that the contract was signed on January 3, 2023.",
+    "Counsel must file a response to the order to show cause within fourteen days.",
+]
+
+
+def load_texts(texts_file: str, limit: int):
+    if texts_file:
+        with open(texts_file, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()][:limit]
+    
+    if os.path.exists(settings.LEXICAL_INDEX_PATH):
+        conn = sqlite3.connect(settings.LEXICAL_INDEX_PATH)
+        try:
+            rows = conn.execute("SELECT body FROM chunks ORDER BY rowid LIMIT ?", (limit,)).fetchall()
+        finally:
+            conn.close()
+        if rows:
+            return [body for (body,) in rows]
+    
+    return SAMPLE_TEXTS[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts-file", help="File with one text per line")
+    parser.add_argument("--limit", type=int, default=512, help="Maximum number of texts to embed")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--top-k", type=int, default=10, help="Neighbours compared for retrieval parity")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts_file, args.limit)
+    report = compare_backends("all-MiniLM-L6-v2", texts, batch_size=args.batch_size, top_k=args.top_k)
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Move existing vectors between the shared default namespace and per-case
+namespaces (VECTOR_NAMESPACE_PER_CASE).
+
+Usage (from the backend directory):
+    python -m scripts.migrate_namespaces [--to per-case|shared] [--case-id ID] [--dry-run]
+
+Vectors are located through the chunk manifest, copied into the target
+namespace and then deleted from the source one, case by case, so the
+command can be re-run after an interruption. Vectors stored before the
+manifest existed are found by their positional IDs (meeting_5_chunk_0,
+document_9_chunk_0, ...) for every meeting and document of the case.
+Flip VECTOR_NAMESPACE_PER_CASE once the migration has finished.
+"""
+import argparse
+import json
+from typing import List
+
+from database import SessionLocal
+from models import Case, CaseDocument, Meeting
+from services.chunk_manifest import chunk_manifest
+from services.pinecone_service import pinecone_service
+from services.vector_store import case_namespace
+
+
+def legacy_vector_ids(store, case_id: int, namespace: str, batch_size: int) -> List[str]:
+    """IDs of a case's vectors stored under positional IDs, before the chunk manifest existed"""
+    db = SessionLocal()
+    try:
+        meeting_ids = [row.id for row in db.query(Meeting.id).filter(Meeting.case_id == case_id)]
+        document_ids = [row.id for row in db.query(CaseDocument.id).filter(CaseDocument.case_id == case_id)]
+    finally:
+        db.close()
+    
+    owners = [f"meeting_{meeting_id}" for meeting_id in meeting_ids]
+    owners += [f"document_{document_id}" for document_id in document_ids]
+    found = []
+    for prefix in owners:
+        if prefix.startswith("meeting_"):
+            found += [vector["id"] for vector in store.fetch([f"{prefix}_summary"], namespace=namespace)]
+        # Positional chunk IDs run from 0 without gaps; page until a page comes back short
+        start = 0
+        while True:
+            page = [f"{prefix}_chunk_{index}" for index in range(start, start + batch_size)]
+            vectors = store.fetch(page, namespace=namespace)
+            found += [vector["id"] for vector in vectors]
+            if len(vectors) < len(page):
+                break
+            start += batch_size
+    return found
+
+
+def migrate_case(store, case_id: int, to_per_case: bool, batch_size: int, dry_run: bool):
+    source, target = (None, case_namespace(case_id)) if to_per_case else (case_namespace(case_id), None)
+    vector_ids = chunk_manifest.get_vector_ids(case_id=case_id)
+    manifest_count = len(vector_ids)
+    vector_ids = list(dict.fromkeys(vector_ids + legacy_vector_ids(store, case_id, source, batch_size)))
+    
+    moved = 0
+    for i in range(0, len(vector_ids), batch_size):
+        vectors = store.fetch(vector_ids[i:i + batch_size], namespace=source)
+        if not vectors or dry_run:
+            moved += len(vectors)
+            continue
+        store.upsert(vectors, namespace=target)
+        store.delete(ids=[vector["id"] for vector in vectors], namespace=source)
+        moved += len(vectors)
+    
+    return {
+        "case_id": case_id,
+        "from": source or "(default)",
+        "to": target or "(default)",
+        "manifest_vectors": manifest_count,
+        "legacy_vectors": len(vector_ids) - manifest_count,
+        "moved": moved,
+        # Already migrated, or never stored successfully
+        "not_in_source": len(vector_ids) - moved
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to", choices=["per-case", "shared"], default="per-case", help="Target layout")
+    parser.add_argument("--case-id", type=int, help="Only migrate this case")
+    parser.add_argument("--batch-size", type=int, default=100, help="Vectors fetched and upserted per call")
+    parser.add_argument("--dry-run", action="store_true", help="Count vectors to move without writing")
+    args = parser.parse_args()
+    
+    store = pinecone_service.index
+    if store is None:
+        raise SystemExit("Vector store not available")
+    
+    if args.case_id:
+        case_ids = [args.case_id]
+    else:
+        # Cases indexed before the manifest existed have no manifest rows
+        db = SessionLocal()
+        try:
+            case_ids = sorted(set(chunk_manifest.get_case_ids()) | {row.id for row in db.query(Case.id)})
+        finally:
+            db.close()
+    cases = []
+    for case_id in case_ids:
+        result = migrate_case(store, case_id, args.to == "per-case", args.batch_size, args.dry_run)
+        print(f"Case {case_id}: {result['moved']} vectors {result['from']} -> {result['to']}")
+        cases.append(result)
+    
+    print(json.dumps({
+        "to": args.to,
+        "dry_run": args.dry_run,
+        "cases": cases,
+        "moved": sum(case["moved"] for case in cases)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Retrieval quality and latency benchmark against the local vector store.
+
+Generates a synthetic legal corpus (documents and meeting transcripts with
+planted facts) plus labeled questions about those facts, ingests it through
+PineconeService with the given chunking/embedding settings and reports:
+
+  * recall@k and MRR of the owning document/meeting among grouped results
+  * answer_recall@k: whether the planted answer text is in the returned content
+  * p50/p95 search latency per search mode
+  * ingestion throughput (chunks and characters per second)
+
+Usage (from the backend directory):
+    python -m scripts.retrieval_benchmark [--chunk-size 1000] [--chunk-overlap 200]
+        [--oversample 3] [--no-metadata-header] [--modes dense,hybrid,lexical]
+        [--embedding-backend torch|onnx] [--dedup-mode off|alias|skip] [--output report.json]
+
+Everything is written to a temporary directory; the configured database and
+vector store are never touched. Compare the JSON reports across builds.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+CLIENTS = ["Harbor Logistics", "Pinecrest Dental", "Redwood Capital", "Summit Roofing", "Alder & Finch LLP"]
+WITNESSES = ["Maria Alvarez", "James Okafor", "Priya Raman", "Thomas Becker", "Elena Petrova", "Samuel Greene"]
+CITIES = ["Denver", "Austin", "Portland", "Tucson", "Raleigh", "Omaha"]
+ITEMS = ["shipping manifest", "invoice ledger", "maintenance log", "board minutes", "email archive", "safety report"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October"]
+
+FILLER = [
+    "Counsel reviewed the procedural history and the scheduling order entered by the court.",
+    "The parties discussed the scope of discovery and the production of electronically stored information.",
+    "Opposing counsel reiterated their position on the motion and reserved all objections.",
+    "The team agreed to circulate a revised draft before the next status conference.",
+    "Privilege log entries were reviewed for consistency with the protective order.",
+    "The client asked about settlement ranges and the likely timeline for trial.",
+    "Several exhibits were marked for identification and will be authenticated later.",
+    "The court reminded the parties of the page limits for supporting briefs.",
+    "Insurance coverage questions were deferred until the carrier responds.",
+    "Expert reports remain due under the current case management order.",
+]
+
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.choice(MONTHS)} {rng.randint(1, 28)}, {rng.randint(2021, 2025)}"
+
+
+def _deposition_fact(rng: random.Random, n: int, client: str):
+    witness, city, date = rng.choice(WITNESSES), rng.choice(CITIES), _date(rng)
+    return (
+        f"The deposition of {witness} is scheduled for {date} in {city}.",
+        f"When is {witness} being deposed in {city} for {client}?",
+        date
+    )
+
+
+def _exhibit_fact(rng: random.Random, n: int, client: str):
+    item = rng.choice(ITEMS)
+    return (
+        f"Exhibit {n} shows that the {item} was altered after the dispute began.",
+        f"Which exhibit shows the {item} was altered in the {client} matter?",
+        f"Exhibit {n}"
+    )
+
+
+def _docket_fact(rng: random.Random, n: int, client: str):
+    docket = f"CV-{2020 + n % 5}-{n:04d}"
+    return (
+        f"Docket entry {docket} records the stipulated extension for the reply brief.",
+        f"What does docket entry {docket} record?",
+        docket
+    )
+
+
+# Each produces (fact sentence, question, answer text found in the fact)
+FACT_TEMPLATES = [_deposition_fact, _exhibit_fact, _docket_fact]
+
+
+def generate_corpus(cases: int, owners_per_case: int, paragraphs: int, seed: int):
+    """Build owners (documents and meetings) with planted facts, and questions about them"""
+    rng = random.Random(seed)
+    owners, questions = [], []
+    fact_number = 100
+    owner_id = 0
+
+    for case_id in range(1, cases + 1):
+        client = CLIENTS[(case_id - 1) % len(CLIENTS)]
+        for _ in range(owners_per_case):
+            owner_id += 1
+            owner_type = "document" if owner_id % 2 else "meeting"
+            body = []
+            for _ in range(paragraphs):
+                sentences = rng.sample(FILLER, 4)
+                # Plant a fact in about half of the paragraphs
+                if rng.random() < 0.5:
+                    fact_number += 1
+                    fact, question, answer = rng.choice(FACT_TEMPLATES)(rng, fact_number, client)
+                    sentences.insert(rng.randrange(len(sentences) + 1), fact)
+                    questions.append({
+                        "query": question,
+                        "case_id": case_id,
+                        "owner": f"{owner_type}_{owner_id}",
+                        "answer": answer
+                    })
+                body.append(" ".join(sentences))
+            owners.append({
+                "owner_type": owner_type,
+                "owner_id": owner_id,
+                "case_id": case_id,
+                "title": f"{client} {'filing' if owner_type == 'document' else 'strategy meeting'} {owner_id}",
+                "case_number": f"CASE-{case_id:03d}",
+                "text": "\n\n".join(body)
+            })
+    return owners, questions
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[index]
+
+
+def configure_environment(args, workdir: str):
+    """Point every store at the temporary directory before settings are first read"""
+    os.environ.update({
+        "VECTOR_STORE_BACKEND": "local",
+        "LOCAL_VECTOR_STORE_DIR": os.path.join(workdir, "vector_store"),
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        "LEXICAL_INDEX_PATH": os.path.join(workdir, "lexical_index.sqlite3"),
+        "CHUNK_STORE_PATH": os.path.join(workdir, "chunk_store.sqlite3"),
+        "NEAR_DUPLICATE_INDEX_PATH": os.path.join(workdir, "near_duplicates.sqlite3"),
+        "NEAR_DUPLICATE_MODE": args.dedup_mode,
+        "EMBEDDING_CACHE_ENABLED": "false",
+        "VECTOR_NAMESPACE_PER_CASE": "false",
+        "CHUNK_SIZE": str(args.chunk_size),
+        "CHUNK_OVERLAP": str(args.chunk_overlap),
+        "CHUNK_METADATA_HEADER": "false" if args.no_metadata_header else "true",
+        "SEARCH_OVERSAMPLE_FACTOR": str(args.oversample),
+        "EMBEDDING_BATCH_SIZE": str(args.batch_size),
+    })
+    if args.embedding_backend:
+        os.environ["EMBEDDING_BACKEND"] = args.embedding_backend
+    # Required settings that the local benchmark never uses
+    for name in ("GEMINI_API_KEY", "PINECONE_API_KEY", "SECRET_KEY"):
+        os.environ.setdefault(name, "benchmark")
+
+
+async def run_benchmark(args, owners, questions):
+    from database import Base, engine
+    import models  # noqa: F401  (registers the tables)
+    from services.pinecone_service import PineconeService
+
+    Base.metadata.create_all(bind=engine)
+    service = PineconeService()
+    service.warm_up()
+
+    # Ingestion
+    start = time.perf_counter()
+    total_chunks = 0
+    for owner in owners:
+        metadata = {"title": owner["title"], "case_number": owner["case_number"]}
+        if owner["owner_type"] == "document":
+            stats = await service.store_case_document(owner["owner_id"], owner["case_id"], owner["text"], metadata)
+        else:
+            stats = await service.store_meeting_content(owner["owner_id"], owner["case_id"], owner["text"], [], metadata)
+        total_chunks += (stats or {}).get("total_chunks", 0)
+    ingest_seconds = time.perf_counter() - start
+    total_chars = sum(len(owner["text"]) for owner in owners)
+
+    ks = sorted(args.k)
+    report = {
+        "ingestion": {
+            "owners": len(owners),
+            "chunks": total_chunks,
+            "characters": total_chars,
+            "seconds": round(ingest_seconds, 3),
+            "chunks_per_second": round(total_chunks / ingest_seconds, 2) if ingest_seconds else None,
+            "characters_per_second": round(total_chars / ingest_seconds, 1) if ingest_seconds else None
+        },
+        "modes": {}
+    }
+
+    for mode in args.modes:
+        hits = {k: 0 for k in ks}
+        answer_hits = {k: 0 for k in ks}
+        reciprocal_ranks = []
+        latencies = []
+
+        # Warm the query path so the first measured search isn't an outlier
+        await service.search_similar_content("warm up", top_k=ks[-1], mode=mode)
+
+        for question in questions:
+            start = time.perf_counter()
+            results = await service.search_similar_content(
+                question["query"], case_id=question["case_id"], top_k=ks[-1], mode=mode
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            ranked_ids = [result["id"] for result in results]
+            rank = ranked_ids.index(question["owner"]) + 1 if question["owner"] in ranked_ids else None
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+            for k in ks:
+                if rank and rank <= k:
+                    hits[k] += 1
+                if any(question["answer"] in result["content"] for result in results[:k]):
+                    answer_hits[k] += 1
+
+        count = len(questions)
+        report["modes"][mode] = {
+            **{f"recall@{k}": round(hits[k] / count, 4) for k in ks},
+            **{f"answer_recall@{k}": round(answer_hits[k] / count, 4) for k in ks},
+            "mrr": round(sum(reciprocal_ranks) / count, 4),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "mean": round(sum(latencies) / count, 3)
+            }
+        }
+
+    stats = service.get_stats()
+    report["encoder"] = stats["encoder"]
+    report["near_duplicates"] = stats["near_duplicates"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=5)
+    parser.add_argument("--owners-per-case", type=int, default=8, help="Documents/meetings per case")
+    parser.add_argument("--paragraphs", type=int, default=12, help="Paragraphs per document/meeting")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--oversample", type=int, default=3, help="SEARCH_OVERSAMPLE_FACTOR")
+    parser.add_argument("--no-metadata-header", action="store_true", help="Embed chunks without the title/case header")
+    parser.add_argument("--embedding-backend", choices=["torch", "onnx"], help="Defaults to EMBEDDING_BACKEND")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--dedup-mode", choices=["off", "alias", "skip"], default="alias", help="NEAR_DUPLICATE_MODE")
+    parser.add_argument("--modes", type=lambda value: value.split(","), default=["dense", "hybrid", "lexical"])
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    owners, questions = generate_corpus(args.cases, args.owners_per_case, args.paragraphs, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="retrieval-benchmark-") as workdir:
+        configure_environment(args, workdir)
+        import asyncio
+        results = asyncio.run(run_benchmark(args, owners, questions))
+
+    report = {
+        "config": {
+            "cases": args.cases,
+            "owners_per_case": args.owners_per_case,
+            "paragraphs": args.paragraphs,
+            "seed": args.seed,
+            "questions": len(questions),
+            "chunk_size": args.chunk_size,
+            "chunk_overlap": args.chunk_overlap,
+            "oversample": args.oversample,
+            "metadata_header": not args.no_metadata_header,
+            "embedding_batch_size": args.batch_size,
+            "dedup_mode": args.dedup_mode
+        },
+        **results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from services.sqlite_cache import SQLiteCache
+
+
+class AnalysisCache:
+    """Persistent cache of LLM transcript analyses.
+
+    Keys are a SHA-256 of the prompt version, the model and the transcript,
+    so re-uploaded transcripts skip the LLM call while a prompt or model
+    change never serves a stale analysis. Entries expire after ``ttl_seconds``
+    and the least recently used are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: Optional[int] = None):
+        self._cache = SQLiteCache(path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prompt_version: str, model: str, transcript: str) -> str:
+        return hashlib.sha256(f"{prompt_version}\0{model}\0{transcript}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis for a key, or None on a miss"""
+        value = self._cache.get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(value.decode("utf-8")) if value is not None else None
+
+    def set(self, key: str, analysis: Dict[str, Any]):
+        """Cache an analysis result"""
+        self._cache.set(key, json.dumps(analysis).encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self._cache.max_entries,
+                "ttl_seconds": self._cache.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
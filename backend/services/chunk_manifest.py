@@ -0,0 +1,160 @@
+from typing import Any, Dict, List, Optional
+from database import SessionLocal
+from models import VectorChunk
+
+
+class ChunkManifest:
+    """Tracks which vectors (and chunk content hashes) exist for each meeting/document"""
+    
+    def get_chunks(self, owner_type: str, owner_id: int) -> List[Dict[str, Any]]:
+        """Return every manifest entry of an owner, ordered by chunk index"""
+        db = SessionLocal()
+        try:
+            rows = db.query(VectorChunk).filter(
+                VectorChunk.owner_type == owner_type,
+                VectorChunk.owner_id == owner_id
+            ).order_by(VectorChunk.chunk_index).all()
+            return [
+                {
+                    "id": row.vector_id,
+                    "chunk_type": row.chunk_type,
+                    "chunk_index": row.chunk_index,
+                    "start_offset": row.start_offset,
+                    "end_offset": row.end_offset,
+                    "chunk_length": row.chunk_length,
+                    "content_hash": row.content_hash,
+                    "alias_of": row.alias_of,
+                    "preview": row.preview,
+                    "extra_data": row.extra_data
+                }
+                for row in rows
+            ]
+        finally:
+            db.close()
+    
+    def get_vector_ids(self, owner_type: str = None, owner_id: int = None, case_id: int = None) -> List[str]:
+        """Return the vector IDs stored for an owner, or for a whole case"""
+        db = SessionLocal()
+        try:
+            query = db.query(VectorChunk.vector_id)
+            if owner_type is not None:
+                query = query.filter(VectorChunk.owner_type == owner_type, VectorChunk.owner_id == owner_id)
+            if case_id is not None:
+                query = query.filter(VectorChunk.case_id == case_id)
+            return [vector_id for (vector_id,) in query.all()]
+        finally:
+            db.close()
+    
+    def get_case_id(self, owner_type: str, owner_id: int) -> Optional[int]:
+        """Return the case an owner's vectors were stored under, if any"""
+        db = SessionLocal()
+        try:
+            row = db.query(VectorChunk.case_id).filter(
+                VectorChunk.owner_type == owner_type,
+                VectorChunk.owner_id == owner_id
+            ).first()
+            return row[0] if row else None
+        finally:
+            db.close()
+    
+    def get_case_ids(self) -> List[int]:
+        """Return every case that has stored vectors"""
+        db = SessionLocal()
+        try:
+            rows = db.query(VectorChunk.case_id).filter(VectorChunk.case_id.isnot(None)).distinct().all()
+            return [case_id for (case_id,) in rows]
+        finally:
+            db.close()
+    
+    def get_aliases_of(self, vector_ids: List[str]) -> List[Dict[str, Any]]:
+        """Return the near-duplicate chunks that point at any of the given canonical vectors"""
+        db = SessionLocal()
+        try:
+            rows = []
+            for i in range(0, len(vector_ids), 500):
+                rows.extend(db.query(VectorChunk).filter(
+                    VectorChunk.alias_of.in_(vector_ids[i:i + 500])
+                ).order_by(VectorChunk.id).all())
+            return [
+                {
+                    "id": row.vector_id,
+                    "owner_type": row.owner_type,
+                    "owner_id": row.owner_id,
+                    "case_id": row.case_id,
+                    "alias_of": row.alias_of,
+                    "extra_data": row.extra_data
+                }
+                for row in rows
+            ]
+        finally:
+            db.close()
+    
+    def set_aliases(self, aliases: Dict[str, Optional[str]]):
+        """Re-point chunks at another canonical vector (None makes a chunk canonical itself)"""
+        db = SessionLocal()
+        try:
+            for vector_id, alias_of in aliases.items():
+                db.query(VectorChunk).filter(VectorChunk.vector_id == vector_id).update({"alias_of": alias_of})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def replace(self, owner_type: str, owner_id: int, case_id: int, entries: List[Dict[str, Any]]):
+        """Replace an owner's manifest with the given chunk entries"""
+        db = SessionLocal()
+        try:
+            db.query(VectorChunk).filter(
+                VectorChunk.owner_type == owner_type,
+                VectorChunk.owner_id == owner_id
+            ).delete()
+            
+            for entry in entries:
+                db.add(VectorChunk(
+                    vector_id=entry["id"],
+                    owner_type=owner_type,
+                    owner_id=owner_id,
+                    case_id=case_id,
+                    chunk_type=entry["chunk_type"],
+                    chunk_index=entry.get("chunk_index"),
+                    start_offset=entry.get("start_offset"),
+                    end_offset=entry.get("end_offset"),
+                    chunk_length=entry.get("chunk_length"),
+                    content_hash=entry["content_hash"],
+                    alias_of=entry.get("alias_of"),
+                    preview=entry.get("preview"),
+                    extra_data=entry.get("extra_data")
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def delete(self, owner_type: str, owner_id: int):
+        """Remove an owner's manifest"""
+        db = SessionLocal()
+        try:
+            db.query(VectorChunk).filter(
+                VectorChunk.owner_type == owner_type,
+                VectorChunk.owner_id == owner_id
+            ).delete()
+            db.commit()
+        finally:
+            db.close()
+    
+    def delete_case(self, case_id: int):
+        """Remove the manifest of every meeting and document in a case"""
+        db = SessionLocal()
+        try:
+            db.query(VectorChunk).filter(VectorChunk.case_id == case_id).delete()
+            db.commit()
+        finally:
+            db.close()
+
+
+# Singleton instance
+chunk_manifest = ChunkManifest()
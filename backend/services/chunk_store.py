@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List
+
+
+class ChunkStore:
+    """Full chunk text keyed by vector ID, zlib-compressed in a local SQLite file.
+
+    Vectors only carry compact filter fields in their metadata; search results
+    are hydrated from here in a single bulk read, which keeps upsert payloads,
+    index storage and query responses small.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6):
+        self.path = path
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunk_text (
+                vector_id TEXT PRIMARY KEY,
+                owner_type TEXT NOT NULL,
+                owner_id INTEGER NOT NULL,
+                case_id INTEGER,
+                body BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunk_text_owner ON chunk_text (owner_type, owner_id);
+            CREATE INDEX IF NOT EXISTS idx_chunk_text_case ON chunk_text (case_id);
+            """
+        )
+        self._conn.commit()
+
+    def replace_owner(
+        self,
+        owner_type: str,
+        owner_id: int,
+        case_id: int,
+        entries: List[Dict[str, Any]],
+        keep_ids: Iterable[str] = ()
+    ):
+        """Store the text of a meeting/document's chunks and drop chunks no longer listed.
+
+        ``keep_ids`` names chunks whose previously stored text must survive even
+        though they are not being rewritten (e.g. a failed re-upsert).
+        """
+        retained = {entry["id"] for entry in entries} | set(keep_ids)
+        rows = [
+            (entry["id"], owner_type, owner_id, case_id,
+             zlib.compress(entry["content"].encode("utf-8"), self.compression_level))
+            for entry in entries
+        ]
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT vector_id FROM chunk_text WHERE owner_type = ? AND owner_id = ?",
+                (owner_type, owner_id)
+            ).fetchall()
+            stale = [(vector_id,) for vector_id, in existing if vector_id not in retained]
+            if stale:
+                self._conn.executemany("DELETE FROM chunk_text WHERE vector_id = ?", stale)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunk_text (vector_id, owner_type, owner_id, case_id, body) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def get_many(self, vector_ids: Iterable[str]) -> Dict[str, str]:
+        """Return the text of every known chunk among vector_ids"""
+        vector_ids = list(dict.fromkeys(vector_ids))
+        found: Dict[str, str] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(vector_ids), 500):
+                batch = vector_ids[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT vector_id, body FROM chunk_text WHERE vector_id IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for vector_id, body in rows:
+                    found[vector_id] = zlib.decompress(body).decode("utf-8")
+        return found
+
+    def delete_owner(self, owner_type: str, owner_id: int):
+        """Remove the text of every chunk of a meeting/document"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunk_text WHERE owner_type = ? AND owner_id = ?",
+                (owner_type, owner_id)
+            )
+            self._conn.commit()
+
+    def delete_case(self, case_id: int):
+        """Remove the text of every chunk of a case"""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunk_text WHERE case_id = ?", (case_id,))
+            self._conn.commit()
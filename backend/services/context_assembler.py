@@ -0,0 +1,165 @@
+import math
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config import get_settings
+
+settings = get_settings()
+
+# Items cut down to less than this many tokens aren't worth including
+MIN_TRUNCATED_TOKENS = 32
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text (Gemini averages about 4 characters per token)"""
+    return math.ceil(len(text) / settings.CHAT_CHARS_PER_TOKEN) if text else 0
+
+
+@dataclass
+class ContextSection:
+    name: str
+    heading: str
+    items: List[str]
+    priority: int
+    required: bool = False
+    sources: List[Optional[str]] = field(default_factory=list)
+    included: List[str] = field(default_factory=list)
+    included_sources: List[str] = field(default_factory=list)
+    dropped: int = 0
+    truncated: int = 0
+
+
+@dataclass
+class AssembledContext:
+    text: str
+    history: List[Any]
+    tokens: int
+    budget: int
+    included: Dict[str, int]
+    dropped: Dict[str, int]
+    truncated: Dict[str, int]
+
+    def report(self) -> Dict[str, Any]:
+        """What went into the prompt and what did not fit, for logs and chat_history"""
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "included": self.included,
+            "dropped": {name: count for name, count in self.dropped.items() if count},
+            "truncated": {name: count for name, count in self.truncated.items() if count}
+        }
+
+
+class ContextAssembler:
+    """Fits chat prompt material into a token budget by priority.
+
+    Sections are rendered in the order they are added but filled in order of
+    ``priority`` (lower first): required sections always go in, then each
+    section takes as many of its items as still fit, truncating an item that
+    would overflow when a useful part of it fits. Conversation history comes
+    last and keeps the most recent exchanges that fit in what remains.
+    """
+
+    def __init__(self, budget_tokens: int = None):
+        self.budget_tokens = budget_tokens or settings.CHAT_PROMPT_TOKEN_BUDGET
+        self.sections: List[ContextSection] = []
+
+    def add(
+        self,
+        name: str,
+        items: Sequence[str],
+        heading: str = "",
+        priority: int = 100,
+        required: bool = False,
+        sources: Sequence[Optional[str]] = ()
+    ):
+        """Offer a section of context items (e.g. one line per insight).
+
+        ``sources`` optionally labels each item with where it came from; only
+        the labels of items that make it into the prompt are reported.
+        """
+        pairs = [(item, source) for item, source in zip_longest(items, sources) if item]
+        if pairs:
+            self.sections.append(ContextSection(
+                name, heading, [item for item, _ in pairs], priority, required,
+                sources=[source for _, source in pairs]
+            ))
+        return self
+
+    @property
+    def sources(self) -> List[str]:
+        """Source labels of the items included by the last ``assemble``, in section order"""
+        return [source for section in self.sections for source in section.included_sources]
+
+    @staticmethod
+    def _truncate(text: str, tokens: int) -> str:
+        return text[:int(tokens * settings.CHAT_CHARS_PER_TOKEN) - 3].rstrip() + "..."
+
+    def assemble(
+        self,
+        fixed_text: str = "",
+        history: Sequence[Any] = (),
+        history_text: Callable[[Any], str] = lambda message: str(message.content)
+    ) -> AssembledContext:
+        """Select context and history for one prompt.
+
+        ``fixed_text`` is everything sent regardless (system prompt, user
+        message); ``history`` is a list of alternating user/assistant
+        messages, oldest first.
+        """
+        used = estimate_tokens(fixed_text)
+        for section in sorted(self.sections, key=lambda s: (not s.required, s.priority)):
+            section.included, section.included_sources, section.dropped, section.truncated = [], [], 0, 0
+            heading_cost = estimate_tokens(section.heading)
+            if section.required:
+                section.included = list(section.items)
+                section.included_sources = [source for source in section.sources if source]
+                used += heading_cost + sum(estimate_tokens(item) for item in section.items)
+                continue
+            for item, source in zip(section.items, section.sources):
+                # The heading is paid for by the section's first item
+                overhead = heading_cost if not section.included else 0
+                cost = estimate_tokens(item) + overhead
+                remaining = self.budget_tokens - used
+                if cost <= remaining:
+                    section.included.append(item)
+                    used += cost
+                elif remaining - overhead >= MIN_TRUNCATED_TOKENS:
+                    section.included.append(self._truncate(item, remaining - overhead))
+                    section.truncated += 1
+                    used = self.budget_tokens
+                else:
+                    section.dropped += 1
+                    continue
+                if source:
+                    section.included_sources.append(source)
+
+        # Whole exchanges, newest first, while they fit
+        kept = 0
+        for end in range(len(history), 1, -2):
+            cost = sum(estimate_tokens(history_text(message)) for message in history[end - 2:end])
+            if used + cost > self.budget_tokens:
+                break
+            used += cost
+            kept += 2
+        kept_history = list(history[len(history) - kept:]) if kept else []
+
+        text = "".join(
+            (f"{section.heading}\n" if section.heading else "") + "\n".join(section.included) + "\n\n"
+            for section in self.sections if section.included
+        )
+        dropped = {section.name: section.dropped for section in self.sections}
+        dropped["history_messages"] = len(history) - kept
+        return AssembledContext(
+            text=text.rstrip("\n") + "\n" if text else "",
+            history=kept_history,
+            tokens=used,
+            budget=self.budget_tokens,
+            included={
+                **{section.name: len(section.included) for section in self.sections},
+                "history_messages": kept
+            },
+            dropped=dropped,
+            truncated={section.name: section.truncated for section in self.sections}
+        )
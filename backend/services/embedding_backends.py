@@ -0,0 +1,128 @@
+import os
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from config import get_settings
+
+settings = get_settings()
+
+ONNX_QUANTIZATION_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+
+def _onnx_quantized_file_name(quantization: str) -> str:
+    # Same naming as sentence-transformers' exporter and the files published on the Hub
+    weights_dtype = "quint8" if quantization == "avx2" else "qint8"
+    return f"onnx/model_{weights_dtype}_{quantization}.onnx"
+
+
+def backend_id(backend: str = None, quantize: bool = None, quantization: str = None) -> str:
+    """Short identifier of an embedding backend configuration, e.g. 'onnx-qint8_avx512_vnni'"""
+    backend = (backend or settings.EMBEDDING_BACKEND).lower()
+    quantize = settings.EMBEDDING_ONNX_QUANTIZE if quantize is None else quantize
+    quantization = quantization or settings.EMBEDDING_ONNX_QUANTIZATION
+    if backend != "onnx":
+        return "torch"
+    if not quantize:
+        return "onnx"
+    return "onnx-" + _onnx_quantized_file_name(quantization)[len("onnx/model_"):-len(".onnx")]
+
+
+def _load_onnx_model(model_name: str, quantize: bool, quantization: str):
+    from sentence_transformers import SentenceTransformer
+
+    if not quantize:
+        return SentenceTransformer(model_name, backend="onnx")
+
+    if quantization not in ONNX_QUANTIZATION_CONFIGS:
+        raise ValueError(f"Unknown EMBEDDING_ONNX_QUANTIZATION: {quantization}")
+    file_name = _onnx_quantized_file_name(quantization)
+
+    # Popular models (including all-MiniLM-L6-v2) ship pre-quantized ONNX files on the Hub
+    try:
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": file_name})
+    except Exception as e:
+        print(f"No published {file_name} for {model_name} ({e}); quantizing locally")
+
+    # Otherwise export to ONNX and apply int8 dynamic quantization once, then reuse the files
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    export_dir = os.path.join(settings.EMBEDDING_ONNX_EXPORT_DIR, model_name.replace("/", "__"))
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        onnx_model = SentenceTransformer(model_name, backend="onnx")
+        onnx_model.save_pretrained(export_dir)
+        export_dynamic_quantized_onnx_model(
+            onnx_model,
+            quantization,
+            export_dir,
+            file_suffix=file_name[len("onnx/model_"):-len(".onnx")]
+        )
+    return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def load_embedding_model(model_name: str, backend: str = None, quantize: bool = None, quantization: str = None):
+    """Load a SentenceTransformer on the PyTorch or ONNX Runtime backend"""
+    from sentence_transformers import SentenceTransformer
+
+    backend = (backend or settings.EMBEDDING_BACKEND).lower()
+    quantize = settings.EMBEDDING_ONNX_QUANTIZE if quantize is None else quantize
+    quantization = quantization or settings.EMBEDDING_ONNX_QUANTIZATION
+
+    if backend == "onnx":
+        return _load_onnx_model(model_name, quantize, quantization)
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+
+def _throughput(model, texts: List[str], batch_size: int) -> Dict[str, Any]:
+    model.encode(texts[:batch_size], batch_size=batch_size)  # warm up kernels
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    elapsed = time.perf_counter() - start
+    return {
+        "embeddings": embeddings,
+        "seconds": round(elapsed, 4),
+        "texts_per_second": round(len(texts) / elapsed, 2) if elapsed else None
+    }
+
+
+def compare_backends(model_name: str, texts: List[str], batch_size: int = 32, top_k: int = 10) -> Dict[str, Any]:
+    """Measure throughput and embedding parity of the configured backend against PyTorch.
+
+    Parity is reported both per text (cosine similarity between the two
+    embeddings of the same text) and for retrieval (overlap of each text's
+    top_k nearest neighbours within the sample under each backend).
+    """
+    candidate_id = backend_id()
+    reference = _throughput(load_embedding_model(model_name, backend="torch"), texts, batch_size)
+    candidate = _throughput(load_embedding_model(model_name), texts, batch_size)
+
+    ref, cand = reference["embeddings"], candidate["embeddings"]
+    cosines = np.sum(ref * cand, axis=1)
+
+    k = min(top_k, len(texts) - 1)
+    overlaps = []
+    if k > 0:
+        ref_scores, cand_scores = ref @ ref.T, cand @ cand.T
+        np.fill_diagonal(ref_scores, -np.inf)
+        np.fill_diagonal(cand_scores, -np.inf)
+        ref_top = np.argsort(-ref_scores, axis=1)[:, :k]
+        cand_top = np.argsort(-cand_scores, axis=1)[:, :k]
+        overlaps = [len(set(r) & set(c)) / k for r, c in zip(ref_top, cand_top)]
+
+    return {
+        "model": model_name,
+        "texts": len(texts),
+        "batch_size": batch_size,
+        "reference": {"backend": "torch", "seconds": reference["seconds"], "texts_per_second": reference["texts_per_second"]},
+        "candidate": {"backend": candidate_id, "seconds": candidate["seconds"], "texts_per_second": candidate["texts_per_second"]},
+        "speedup": round(reference["seconds"] / candidate["seconds"], 2) if candidate["seconds"] else None,
+        "cosine_similarity": {
+            "mean": round(float(np.mean(cosines)), 5),
+            "min": round(float(np.min(cosines)), 5),
+            "p5": round(float(np.percentile(cosines, 5)), 5)
+        },
+        f"neighbor_overlap@{k}": round(float(np.mean(overlaps)), 4) if overlaps else None
+    }
@@ -0,0 +1,104 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.sqlite_cache import SQLiteCache
+
+
+class EmbeddingCache:
+    """On-disk, content-addressed cache of text embeddings.
+
+    Keys are a SHA-256 of the model name and the exact text that was embedded,
+    so switching models never returns stale vectors. Embedded chunk text holds
+    no position, so re-indexing, reprocessing and chunks that merely moved hit
+    the cache. With CHUNK_METADATA_HEADER on, the title/case header is part of
+    that text: the same exhibit under a new title only hits the cache when the
+    header is turned off.
+    """
+
+    def __init__(self, model_name: str, path: str, max_entries: int):
+        self.model_name = model_name
+        self._cache = SQLiteCache(path, max_entries=max_entries)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for a text, or None on a miss"""
+        return self.get_many([text]).get(text)
+
+    def get_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings keyed by text for every text that is cached"""
+        keys = {text: self._key(text) for text in texts}
+        found = self._cache.get_many(keys.values())
+        return {
+            text: np.frombuffer(found[key], dtype=np.float32).tolist()
+            for text, key in keys.items()
+            if key in found
+        }
+
+    def set(self, text: str, embedding: List[float]):
+        """Cache a single embedding"""
+        self.set_many({text: embedding})
+
+    def set_many(self, embeddings: Dict[str, List[float]]):
+        """Cache many embeddings in one transaction"""
+        self._cache.set_many([
+            (self._key(text), np.asarray(embedding, dtype=np.float32).tobytes())
+            for text, embedding in embeddings.items()
+            if embedding is not None
+        ])
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class QueryEmbeddingCache:
+    """Bounded in-memory LRU cache of query embeddings, shared across requests in a worker"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(query: str) -> str:
+        # Collapse whitespace so trivially different spellings of a templated question share an entry
+        return " ".join(query.split())
+
+    def get(self, query: str) -> Optional[List[float]]:
+        key = self._key(query)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def set(self, query: str, embedding: List[float]):
+        if embedding is None or self.max_entries <= 0:
+            return
+        key = self._key(query)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class EmbeddingWorkerPool:
+    """Runs CPU-bound embedding and chunking jobs on dedicated worker threads.
+
+    Jobs are taken from a priority queue, so an interactive query embedding
+    submitted while a large document is being ingested runs as soon as a
+    worker finishes its current batch instead of waiting behind the whole
+    document. Bulk jobs are admitted through a bounded backlog; interactive
+    jobs are small and always admitted.
+
+    Threads rather than processes are used because the model is large and
+    SentenceTransformer/PyTorch release the GIL while encoding.
+    """
+
+    INTERACTIVE = 0
+    BULK = 1
+
+    def __init__(self, workers: int, max_queue_size: int):
+        self.workers = max(1, workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._bulk_slots: Optional[asyncio.Semaphore] = None
+        self._bulk_slots_loop = None
+        self._stats_lock = threading.Lock()
+        self._completed = {self.INTERACTIVE: 0, self.BULK: 0}
+        self._in_flight = 0
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"embedding-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            priority, _, func, args, loop, future = self._queue.get()
+            if future.cancelled():
+                continue
+
+            with self._stats_lock:
+                self._in_flight += 1
+            try:
+                result = func(*args)
+                loop.call_soon_threadsafe(self._resolve, future, result, None)
+            except Exception as e:
+                loop.call_soon_threadsafe(self._resolve, future, None, e)
+            finally:
+                with self._stats_lock:
+                    self._in_flight -= 1
+                    self._completed[priority] += 1
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any, error: Optional[Exception]):
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _get_bulk_slots(self) -> asyncio.Semaphore:
+        # Semaphores belong to an event loop; create one for whichever loop is running
+        loop = asyncio.get_running_loop()
+        if self._bulk_slots is None or self._bulk_slots_loop is not loop:
+            self._bulk_slots = asyncio.Semaphore(self.max_queue_size)
+            self._bulk_slots_loop = loop
+        return self._bulk_slots
+
+    async def run(self, func: Callable, *args, priority: int = BULK) -> Any:
+        """Run func(*args) on a worker thread without blocking the event loop"""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+
+        if priority == self.INTERACTIVE:
+            return await self._submit(loop, func, args, priority)
+
+        async with self._get_bulk_slots():
+            return await self._submit(loop, func, args, priority)
+
+    async def _submit(self, loop, func: Callable, args: tuple, priority: int) -> Any:
+        future = loop.create_future()
+        self._queue.put((priority, next(self._sequence), func, args, loop, future))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queue.qsize(),
+                "in_flight": self._in_flight,
+                "completed_interactive": self._completed[self.INTERACTIVE],
+                "completed_bulk": self._completed[self.BULK]
+            }
@@ -1,19 +1,66 @@
 import google.generativeai as genai
 from config import get_settings
+from services.session_store import SessionStore, load_recent_turns
+import asyncio
 import json
-from typing import Dict, List, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 settings = get_settings()
-genai.configure(api_key=settings.GEMINI_API_KEY)
 
 
 class GeminiService:
     def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-        # Store chat sessions
-        self.chat_sessions = {}
+        # Configured and created on first use so importing this module has no side effects
+        self._model = None
+        # Chat sessions per session ID, bounded; evicted sessions are rebuilt from the chat_history table
+        self.chat_sessions = SessionStore(
+            max_entries=settings.CHAT_SESSION_MAX_ENTRIES,
+            ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+            max_bytes=settings.CHAT_SESSION_MAX_BYTES,
+            sizer=self._chat_size
+        )
+        # Bounds the Gemini calls in flight so a burst of requests queues instead of piling up
+        self._semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENT_REQUESTS)
 
-    async def analyze_transcript(self, transcript: str) -> Dict[str, Any]:
+    @property
+    def model(self):
+        if self._model is None:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self._model = genai.GenerativeModel('gemini-2.5-flash')
+        return self._model
+
+    @staticmethod
+    def _chat_size(chat) -> int:
+        return sum(
+            len(getattr(part, "text", "") or "")
+            for content in chat.history
+            for part in content.parts
+        )
+
+    def _restore_chat(self, session_id: str, conversation_context: str):
+        """Start a chat seeded with the session's saved exchanges, or None for a new session"""
+        turns = load_recent_turns(session_id, settings.CHAT_SESSION_HISTORY_MESSAGES // 2)
+        if not turns:
+            return None
+        history = []
+        for user_message, bot_response in turns:
+            history.append({"role": "user", "parts": [user_message]})
+            history.append({"role": "model", "parts": [bot_response]})
+        # The case context normally opens the conversation; carry it into the first turn
+        history[0]["parts"].insert(0, conversation_context)
+        return self.model.start_chat(history=history)
+
+    async def _call(self, request: Callable[[], Awaitable], timeout: Optional[float]):
+        """Run a Gemini API coroutine under the concurrency limit and a timeout.
+        
+        The event loop stays free while the request is in flight; when the
+        timeout expires (or the caller is cancelled) the request is cancelled.
+        """
+        timeout = settings.GEMINI_REQUEST_TIMEOUT_SECONDS if timeout is None else timeout
+        async with self._semaphore:
+            return await asyncio.wait_for(request(), timeout=timeout)
+
+    async def analyze_transcript(self, transcript: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Analyze transcript and extract legal insights"""
         
         prompt = f"""
@@ -54,7 +101,7 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self._call(lambda: self.model.generate_content_async(prompt), timeout)
             text = response.text
             
             # Extract JSON from markdown code blocks if present
@@ -65,19 +112,26 @@ class GeminiService:
             
             result = json.loads(text)
             return result
+        except asyncio.TimeoutError:
+            print("Error analyzing transcript: Gemini did not respond within the timeout")
+            return self._fallback_analysis(transcript)
         except Exception as e:
             print(f"Error analyzing transcript: {e}")
-            return {
-                "summary": "Error processing transcript",
-                "minutes": transcript[:500] + "...",
-                "critical_points": [],
-                "decisions": [],
-                "deadlines": [],
-                "risk_areas": [],
-                "action_items": []
-            }
+            return self._fallback_analysis(transcript)
+
+    @staticmethod
+    def _fallback_analysis(transcript: str) -> Dict[str, Any]:
+        return {
+            "summary": "Error processing transcript",
+            "minutes": transcript[:500] + "...",
+            "critical_points": [],
+            "decisions": [],
+            "deadlines": [],
+            "risk_areas": [],
+            "action_items": []
+        }
 
-    async def generate_summary(self, transcript: str) -> str:
+    async def generate_summary(self, transcript: str, timeout: Optional[float] = None) -> str:
         """Generate a concise summary of the transcript"""
         
         prompt = f"""
@@ -91,12 +145,21 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self._call(lambda: self.model.generate_content_async(prompt), timeout)
             return response.text
+        except asyncio.TimeoutError:
+            return "Error generating summary: Gemini did not respond within the timeout"
         except Exception as e:
             return f"Error generating summary: {str(e)}"
 
-    async def chat_with_context(self, message: str, context: str = "", history: List[Dict] = None, session_id: str = "default") -> str:
+    async def chat_with_context(
+        self,
+        message: str,
+        context: str = "",
+        history: List[Dict] = None,
+        session_id: str = "default",
+        timeout: Optional[float] = None
+    ) -> str:
         """Chat with legal context using Gemini's chat feature"""
         
         # Build conversation context
@@ -112,28 +175,38 @@ Instructions:
 - Be concise but thorough
 """
         
-        # Get or create chat session
-        if session_id not in self.chat_sessions:
-            self.chat_sessions[session_id] = self.model.start_chat(history=[])
+        # Get, rehydrate or create chat session
+        chat = self.chat_sessions.get(
+            session_id, loader=lambda sid: self._restore_chat(sid, conversation_context)
+        )
+        if chat is None:
+            chat = self.model.start_chat(history=[])
+            self.chat_sessions.set(session_id, chat)
             # Send initial context
             try:
-                self.chat_sessions[session_id].send_message(conversation_context)
-            except:
+                await self._call(lambda: chat.send_message_async(conversation_context), timeout)
+            except Exception:
                 pass  # Context setting might fail, continue anyway
         
-        chat = self.chat_sessions[session_id]
-        
         try:
-            response = chat.send_message(message)
+            response = await self._call(lambda: chat.send_message_async(message), timeout)
+            # The chat grew in place; refresh its size accounting
+            self.chat_sessions.set(session_id, chat)
             return response.text
+        except asyncio.TimeoutError:
+            print("Error in chat: Gemini did not respond within the timeout")
+            return "I apologize, but the request timed out. Please try again."
         except Exception as e:
             print(f"Error in chat: {e}")
             return f"I apologize, but I encountered an error: {str(e)}"
     
     def clear_chat_session(self, session_id: str = "default"):
         """Clear a specific chat session"""
-        if session_id in self.chat_sessions:
-            del self.chat_sessions[session_id]
+        self.chat_sessions.delete(session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Chat session statistics for the /metrics endpoint"""
+        return {"chat_sessions": self.chat_sessions.stats()}
 
 
 # Singleton instance
@@ -1,13 +1,118 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.tools import tool
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage
-from langchain_community.tools import DuckDuckGoSearchResults
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage, messages_from_dict, messages_to_dict
+from langchain_text_splitters import RecursiveCharacterTextSplitter
 from config import get_settings
-from typing import Dict, List, Any, Optional
+from services.analysis_cache import AnalysisCache
+from services.session_store import create_session_backend, load_recent_turns
+from services.context_assembler import ContextAssembler
+from services.web_search import web_search_service
+from typing import AsyncIterator, Dict, List, Any, Optional, Union
+import asyncio
+import hashlib
 import json
+import re
 
 settings = get_settings()
 
+LLM_MODEL = "gemini-2.5-flash"
+
+CHAT_SYSTEM_PROMPT = """You are Lexicase AI, an expert legal assistant specialized in court proceedings and case management.
+
+Your capabilities:
+- Analyze legal cases and provide insights
+- Answer questions about case details, meetings, and action items
+- Search the web for legal precedents and case law when needed
+- Provide professional legal assistance
+
+Important Guidelines:
+1. Use the case context provided below to answer questions about the current case
+2. ONLY use web_search tool when:
+   - User asks about legal precedents, case law, or citations
+   - User asks "cases like this" or "similar cases" - formulate a search query based on case context
+   - User needs current legal information not in the case context
+   - User explicitly requests external information
+3. When formulating web search queries:
+   - Include case type, legal area, jurisdiction if relevant from context
+   - Use proper legal terminology
+   - Be specific (e.g., "contract dispute precedents California 2024" instead of just "cases")
+4. Always cite sources when using web search results
+5. Be concise but thorough"""
+
+TRANSCRIPT_ANALYSIS_PROMPT = """
+        You are an expert legal assistant analyzing a court hearing transcript. 
+        Analyze the following transcript and extract:
+        
+        1. Summary: A concise summary of the hearing
+        2. Meeting Minutes: Detailed, legally relevant meeting minutes
+        3. Critical Points: Important motions, decisions, and legal arguments
+        4. Decisions: All judicial decisions made
+        5. Deadlines: Any mentioned dates or deadlines
+        6. Risk Areas: Potential legal risks or concerns
+        7. Action Items: Tasks, responsibilities, and follow-ups needed
+        
+        Transcript:
+        {transcript}
+        
+        Return your analysis as a JSON object with the following structure:
+        {{
+            "summary": "...",
+            "minutes": "...",
+            "critical_points": [
+                {{"type": "critical_point", "title": "...", "description": "...", "severity": "high/medium/low", "timestamp": "..."}}
+            ],
+            "decisions": [
+                {{"type": "decision", "title": "...", "description": "...", "severity": "medium"}}
+            ],
+            "deadlines": [
+                {{"type": "deadline", "title": "...", "description": "...", "severity": "high", "timestamp": "..."}}
+            ],
+            "risk_areas": [
+                {{"type": "risk_area", "title": "...", "description": "...", "severity": "high/medium/low"}}
+            ],
+            "action_items": [
+                {{"title": "...", "description": "...", "assigned_to": "...", "priority": "high/medium/low", "due_date": "..."}}
+            ]
+        }}
+        """
+
+SEGMENT_ANALYSIS_NOTE = """
+        This is part {index} of {total} of a longer transcript. Analyze only this part;
+        the parts are analyzed separately and merged afterwards.
+        """
+
+CONVERSATION_SUMMARY_PROMPT = """
+        You maintain a running summary of a conversation between a lawyer and a legal assistant.
+        Update the summary with the new exchanges below. Keep every fact, name, date, decision,
+        open question and commitment that later questions may depend on; drop pleasantries.
+        Write at most {max_chars} characters. Return only the updated summary.
+        
+        Current summary:
+        {summary}
+        
+        New exchanges:
+        {exchanges}
+        """
+
+SUMMARY_MERGE_PROMPT = """
+        You are an expert legal assistant. The following are summaries of consecutive parts
+        of one court hearing transcript. Write a single concise summary of the whole hearing.
+        Return only the summary text.
+        
+        {summaries}
+        """
+
+# Changes whenever the prompt text changes, so cached analyses from an older prompt are never served
+ANALYSIS_PROMPT_VERSION = hashlib.sha256(
+    (TRANSCRIPT_ANALYSIS_PROMPT + SEGMENT_ANALYSIS_NOTE + SUMMARY_MERGE_PROMPT).encode("utf-8")
+).hexdigest()[:16]
+
+INSIGHT_KEYS = ("critical_points", "decisions", "deadlines", "risk_areas")
+
+# Per-tool time limits; tools not listed get TOOL_TIMEOUT_SECONDS
+TOOL_TIMEOUTS = {"web_search": settings.WEB_SEARCH_TIMEOUT_SECONDS}
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
 
 # Define web search tool
 @tool
@@ -24,23 +129,9 @@ def web_search(query: str) -> str:
     Returns:
         Formatted search results with titles, snippets, and URLs.
     """
-    try:
-        search_tool = DuckDuckGoSearchResults(output_format="list", max_results=5)
-        results = search_tool.invoke(query)
-        
-        if not results:
-            return "No search results found."
-        
-        # Format results
-        formatted = "Web Search Results:\n\n"
-        for idx, result in enumerate(results, 1):
-            formatted += f"{idx}. {result.get('title', 'No title')}\n"
-            formatted += f"   {result.get('snippet', 'No snippet')}\n"
-            formatted += f"   Source: {result.get('link', 'No URL')}\n\n"
-        
-        return formatted
-    except Exception as e:
-        return f"Error performing web search: {str(e)}"
+    # Chat turns run tool calls through LangChainGeminiService._execute_tool_call (async);
+    # this body serves direct invocations of the tool
+    return web_search_service.search_sync(query)
 
 
 @tool
@@ -62,21 +153,229 @@ def get_case_context(question: str) -> str:
 
 class LangChainGeminiService:
     def __init__(self):
-        # Initialize LangChain's ChatGoogleGenerativeAI
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=settings.GEMINI_API_KEY,
-            temperature=0.7,
-            convert_system_message_to_human=True
+        # LangChain's ChatGoogleGenerativeAI is built on first use (or by warm_up at startup)
+        self._llm = None
+        
+        # Chat state per session ({"summary", "messages"}, messages serialized) in the
+        # CHAT_SESSION_BACKEND store; missing sessions rehydrate from the chat_history table
+        self.chat_histories = create_session_backend(sizer=self._history_size, loader=self._load_history)
+        
+        # Background folding of older turns into each session's running summary
+        self._summarizing = set()
+        self._summary_tasks = set()
+        self.summary_runs = 0
+        self.summary_failures = 0
+        
+        # Analyses of previously seen transcripts, so duplicate uploads skip the LLM
+        self.analysis_cache = None
+        if settings.ANALYSIS_CACHE_ENABLED:
+            try:
+                self.analysis_cache = AnalysisCache(
+                    settings.ANALYSIS_CACHE_PATH,
+                    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS
+                )
+            except Exception as e:
+                print(f"Error opening analysis cache: {e}")
+    
+    @property
+    def llm(self) -> ChatGoogleGenerativeAI:
+        if self._llm is None:
+            self._llm = ChatGoogleGenerativeAI(
+                model=LLM_MODEL,
+                google_api_key=settings.GEMINI_API_KEY,
+                temperature=0.7,
+                convert_system_message_to_human=True
+            )
+        return self._llm
+    
+    @property
+    def is_ready(self) -> bool:
+        return self._llm is not None
+    
+    def warm_up(self):
+        """Build the Gemini client ahead of the first request"""
+        self.llm
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics for the /metrics endpoint"""
+        return {
+            "analysis_cache": self.analysis_cache.stats() if self.analysis_cache is not None else None,
+            "chat_sessions": self.chat_histories.stats(),
+            "web_search": web_search_service.stats(),
+            "conversation_summaries": {
+                "enabled": settings.CHAT_SUMMARY_ENABLED,
+                "runs": self.summary_runs,
+                "failures": self.summary_failures,
+                "in_progress": len(self._summarizing)
+            }
+        }
+    
+    @staticmethod
+    def _session_state(value: Any) -> Dict[str, Any]:
+        # Sessions stored before running summaries existed are a bare message list
+        if isinstance(value, list):
+            return {"summary": "", "messages": value}
+        return value or {"summary": "", "messages": []}
+    
+    @classmethod
+    def _history_size(cls, value: Any) -> int:
+        state = cls._session_state(value)
+        return len(state["summary"].encode("utf-8")) + sum(
+            len(str(message["data"]["content"]).encode("utf-8")) for message in state["messages"]
         )
+    
+    @staticmethod
+    def _load_history(session_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild a session's recent history from saved exchanges"""
+        turns = load_recent_turns(session_id, settings.CHAT_SESSION_HISTORY_MESSAGES // 2)
+        if not turns:
+            return None
+        history = []
+        for user_message, bot_response in turns:
+            history.append(HumanMessage(content=user_message))
+            history.append(AIMessage(content=bot_response))
+        return {"summary": "", "messages": messages_to_dict(history)}
+    
+    def _bind_tools(self, web_search_enabled: bool):
+        """The LLM with the enabled tools bound, and the list of those tools"""
+        tools = [web_search] if web_search_enabled else []
+        llm_with_tools = self.llm.bind_tools(tools) if tools else self.llm
+        return llm_with_tools, tools
+    
+    def _build_messages(self, message: str, case_context: Union[str, ContextAssembler], session_id: str):
+        """System prompt with the case context, the session's history and the new user message.
+        
+        Context and history are fitted to CHAT_PROMPT_TOKEN_BUDGET by the
+        context assembler (a plain string context is always sent whole); the
+        session's running summary of older turns always goes in.
+        Returns the messages, the session state they were built from and the assembly report.
+        """
+        if isinstance(case_context, str):
+            case_context = ContextAssembler().add("case_context", [case_context], required=True)
+        session_state = self._session_state(self.chat_histories.get(session_id))
+        chat_history = messages_from_dict(session_state["messages"])
+        if session_state["summary"]:
+            case_context.add(
+                "conversation_summary", [session_state["summary"]],
+                heading="Earlier in this conversation (summary):", required=True
+            )
+        
+        context_header = "\n\nCurrent Case Context:\n"
+        assembled = case_context.assemble(
+            fixed_text=CHAT_SYSTEM_PROMPT + context_header + message,
+            history=chat_history
+        )
+        system_prompt = CHAT_SYSTEM_PROMPT
+        if assembled.text:
+            system_prompt += context_header + assembled.text
+        else:
+            system_prompt += "\n\nNo specific case selected. Provide general legal assistance."
         
-        # Store chat histories per session
-        self.chat_histories: Dict[str, List] = {}
+        messages = [SystemMessage(content=system_prompt)]
+        messages.extend(assembled.history)
+        messages.append(HumanMessage(content=message))
+        
+        report = assembled.report()
+        print(f"[LangChain] Context: {report}", flush=True)
+        return messages, session_state, report
+    
+    async def _execute_tool_call(self, tool_call: Dict[str, Any]):
+        """Run one tool call from the model; returns the ToolMessage and the source URLs it cited"""
+        print(f"[LangChain] Executing tool: {tool_call['name']} with args: {tool_call['args']}", flush=True)
+        name = tool_call["name"]
+        timeout = TOOL_TIMEOUTS.get(name, settings.TOOL_TIMEOUT_SECONDS)
+        urls = []
+        try:
+            if name == "web_search":
+                result = await asyncio.wait_for(web_search_service.search(tool_call["args"].get("query", "")), timeout)
+                urls = re.findall(r'Source: (https?://[^\s]+)', result)
+            else:
+                result = "Tool not found"
+        except asyncio.TimeoutError:
+            print(f"[LangChain] Tool {name} timed out after {timeout}s", flush=True)
+            result = f"The {name} tool did not respond within {timeout} seconds."
+        return ToolMessage(content=result, tool_call_id=tool_call["id"]), urls
+    
+    async def _execute_tool_calls(self, tool_calls: List[Dict[str, Any]]):
+        """Run all tool calls of one model turn concurrently; results are in call order"""
+        return await asyncio.gather(*(self._execute_tool_call(tool_call) for tool_call in tool_calls))
+    
+    @staticmethod
+    def _content_text(content: Any) -> str:
+        """Flatten message content (a string or a list of parts) to plain text"""
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            text = ""
+            for part in content:
+                if isinstance(part, dict) and "text" in part:
+                    text += part["text"]
+                elif isinstance(part, str):
+                    text += part
+                else:
+                    text += str(part)
+            return text
+        return str(content)
+    
+    def _remember_turn(self, session_id: str, session_state: Dict[str, Any], message: str, response_text: str):
+        """Append a completed exchange to the session's history (keep only the last few messages)"""
+        # Re-read the state: a summary may have been folded in while the answer was generated
+        current = self.chat_histories.get(session_id, loader=lambda _: None)
+        state = self._session_state(current) if current is not None else session_state
+        messages = state["messages"] + messages_to_dict([HumanMessage(content=message), AIMessage(content=response_text)])
+        messages = messages[-settings.CHAT_SESSION_HISTORY_MESSAGES:]
+        self.chat_histories.set(session_id, {"summary": state["summary"], "messages": messages})
+        
+        if settings.CHAT_SUMMARY_ENABLED and len(messages) > settings.CHAT_SUMMARY_TRIGGER_MESSAGES:
+            self._schedule_summary(session_id)
+    
+    def _schedule_summary(self, session_id: str):
+        """Fold older turns into the running summary in the background, off the request path"""
+        if session_id in self._summarizing:
+            return
+        self._summarizing.add(session_id)
+        task = asyncio.create_task(self._summarize_session(session_id))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._summary_tasks.add(task)
+        task.add_done_callback(self._summary_tasks.discard)
+    
+    async def _summarize_session(self, session_id: str):
+        """Replace all but the last CHAT_SUMMARY_KEEP_MESSAGES messages with an updated summary"""
+        try:
+            state = self._session_state(self.chat_histories.get(session_id, loader=lambda _: None))
+            fold = state["messages"][:max(0, len(state["messages"]) - settings.CHAT_SUMMARY_KEEP_MESSAGES)]
+            if len(fold) < 2:
+                return
+            exchanges = "\n".join(
+                f"{'User' if entry['type'] == 'human' else 'Assistant'}: {entry['data']['content']}"
+                for entry in fold
+            )
+            prompt = CONVERSATION_SUMMARY_PROMPT.format(
+                max_chars=settings.CHAT_SUMMARY_MAX_CHARS,
+                summary=state["summary"] or "(none yet)",
+                exchanges=exchanges
+            )
+            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            summary = self._content_text(response.content).strip()[:settings.CHAT_SUMMARY_MAX_CHARS]
+            
+            # Turns may have been added meanwhile; only drop the messages that were summarized
+            current = self._session_state(self.chat_histories.get(session_id, loader=lambda _: None))
+            if current["messages"][:len(fold)] != fold:
+                return  # History changed underneath (cleared or trimmed); retry after the next turn
+            self.chat_histories.set(session_id, {"summary": summary, "messages": current["messages"][len(fold):]})
+            self.summary_runs += 1
+            print(f"[LangChain] Folded {len(fold)} messages into the summary of session {session_id}", flush=True)
+        except Exception as e:
+            self.summary_failures += 1
+            print(f"[LangChain] Error summarizing session {session_id}: {e}", flush=True)
+        finally:
+            self._summarizing.discard(session_id)
     
     async def chat_with_tools(
         self,
         message: str,
-        case_context: str = "",
+        case_context: Union[str, ContextAssembler] = "",
         session_id: str = "default",
         web_search_enabled: bool = False
     ) -> Dict[str, Any]:
@@ -85,7 +384,8 @@ class LangChainGeminiService:
         
         Args:
             message: User's message
-            case_context: Full context about the case (meetings, insights, action items, etc.)
+            case_context: Context about the case (meetings, insights, action items, etc.),
+                as text or as a ContextAssembler to fit to the prompt budget
             session_id: Chat session ID
             web_search_enabled: Whether to enable web search tool
         
@@ -93,55 +393,8 @@ class LangChainGeminiService:
             Dict with response and sources
         """
         try:
-            # Prepare tools
-            tools = []
-            if web_search_enabled:
-                tools.append(web_search)
-            
-            # Bind tools to LLM
-            if tools:
-                llm_with_tools = self.llm.bind_tools(tools)
-            else:
-                llm_with_tools = self.llm
-            
-            # Get or initialize chat history
-            if session_id not in self.chat_histories:
-                self.chat_histories[session_id] = []
-            
-            chat_history = self.chat_histories[session_id]
-            
-            # Build system message with case context
-            system_prompt = """You are Lexicase AI, an expert legal assistant specialized in court proceedings and case management.
-
-Your capabilities:
-- Analyze legal cases and provide insights
-- Answer questions about case details, meetings, and action items
-- Search the web for legal precedents and case law when needed
-- Provide professional legal assistance
-
-Important Guidelines:
-1. Use the case context provided below to answer questions about the current case
-2. ONLY use web_search tool when:
-   - User asks about legal precedents, case law, or citations
-   - User asks "cases like this" or "similar cases" - formulate a search query based on case context
-   - User needs current legal information not in the case context
-   - User explicitly requests external information
-3. When formulating web search queries:
-   - Include case type, legal area, jurisdiction if relevant from context
-   - Use proper legal terminology
-   - Be specific (e.g., "contract dispute precedents California 2024" instead of just "cases")
-4. Always cite sources when using web search results
-5. Be concise but thorough"""
-            
-            if case_context:
-                system_prompt += f"\n\nCurrent Case Context:\n{case_context}"
-            else:
-                system_prompt += "\n\nNo specific case selected. Provide general legal assistance."
-            
-            # Build messages
-            messages = [SystemMessage(content=system_prompt)]
-            messages.extend(chat_history)
-            messages.append(HumanMessage(content=message))
+            llm_with_tools, tools = self._bind_tools(web_search_enabled)
+            messages, session_state, context_report = self._build_messages(message, case_context, session_id)
             
             print(f"[LangChain] Processing: {message}", flush=True)
             print(f"[LangChain] Tools enabled: {[t.name for t in tools]}", flush=True)
@@ -160,71 +413,24 @@ Important Guidelines:
                 iteration += 1
                 print(f"[LangChain] Tool calls detected: {ai_msg.tool_calls}", flush=True)
                 
-                # Execute each tool call
-                for tool_call in ai_msg.tool_calls:
-                    tool_name = tool_call["name"]
-                    tool_args = tool_call["args"]
-                    tool_id = tool_call["id"]
-                    
-                    print(f"[LangChain] Executing tool: {tool_name} with args: {tool_args}", flush=True)
-                    
-                    # Execute the tool
-                    if tool_name == "web_search":
-                        result = web_search.invoke(tool_args)
-                        
-                        # Extract URLs for sources
-                        import re
-                        urls = re.findall(r'Source: (https?://[^\s]+)', result)
-                        sources.extend(urls)
-                    else:
-                        result = "Tool not found"
-                    
-                    # Create tool message
-                    tool_message = ToolMessage(
-                        content=result,
-                        tool_call_id=tool_id
-                    )
-                    
-                    # Add to messages
-                    messages.append(ai_msg)
+                messages.append(ai_msg)
+                for tool_message, urls in await self._execute_tool_calls(ai_msg.tool_calls):
+                    sources.extend(urls)
                     messages.append(tool_message)
                 
                 # Invoke again with tool results
                 ai_msg = await llm_with_tools.ainvoke(messages)
             
             # Get final response - ensure it's a string
-            response_content = ai_msg.content
-            
-            # Handle different content types
-            if isinstance(response_content, list):
-                # If content is a list, extract text from each part
-                response_text = ""
-                for part in response_content:
-                    if isinstance(part, dict) and "text" in part:
-                        response_text += part["text"]
-                    elif isinstance(part, str):
-                        response_text += part
-                    else:
-                        response_text += str(part)
-            elif isinstance(response_content, str):
-                response_text = response_content
-            else:
-                response_text = str(response_content)
-            
-            # Update chat history (keep only last 20 messages)
-            chat_history.append(HumanMessage(content=message))
-            chat_history.append(AIMessage(content=response_text))
-            
-            if len(chat_history) > 20:
-                self.chat_histories[session_id] = chat_history[-20:]
-            else:
-                self.chat_histories[session_id] = chat_history
+            response_text = self._content_text(ai_msg.content)
+            self._remember_turn(session_id, session_state, message, response_text)
             
             print(f"[LangChain] Response generated. Sources: {len(sources)}", flush=True)
             
             return {
                 "response": response_text,
-                "sources": sources if sources else None
+                "sources": sources if sources else None,
+                "context": context_report
             }
             
         except Exception as e:
@@ -236,62 +442,233 @@ Important Guidelines:
                 "sources": None
             }
     
+    async def stream_chat_with_tools(
+        self,
+        message: str,
+        case_context: Union[str, ContextAssembler] = "",
+        session_id: str = "default",
+        web_search_enabled: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a chat turn as events while Gemini generates it
+        
+        Yields dicts of the form {"event": ..., "data": {...}}:
+            context: the context assembler's report - what fit in the prompt budget
+            token: {"text"} - a piece of the answer, as soon as the model emits it
+            tool_start: {"id", "name", "args"} - a tool call is about to run
+            tool_end: {"id", "name", "sources"} - the tool call finished
+            done: {"response", "sources"} - the complete answer; always last on success
+            error: {"message"} - the turn failed; nothing is added to the history
+        
+        The session history is only updated once the answer is complete, so a
+        client that disconnects mid-stream leaves no half answer behind.
+        """
+        try:
+            llm_with_tools, tools = self._bind_tools(web_search_enabled)
+            messages, session_state, context_report = self._build_messages(message, case_context, session_id)
+            
+            print(f"[LangChain] Streaming: {message}", flush=True)
+            print(f"[LangChain] Tools enabled: {[t.name for t in tools]}", flush=True)
+            yield {"event": "context", "data": context_report}
+            
+            sources = []
+            response_text = ""
+            max_iterations = 3  # Prevent infinite loops
+            iteration = 0
+            
+            while True:
+                # Tool calls arrive as chunks too; adding the chunks up assembles them
+                ai_msg = None
+                turn_text = ""
+                async for chunk in llm_with_tools.astream(messages):
+                    ai_msg = chunk if ai_msg is None else ai_msg + chunk
+                    text = self._content_text(chunk.content)
+                    if text:
+                        turn_text += text
+                        yield {"event": "token", "data": {"text": text}}
+                response_text += turn_text
+                
+                if ai_msg is None or not ai_msg.tool_calls or iteration >= max_iterations:
+                    break
+                iteration += 1
+                print(f"[LangChain] Tool calls detected: {ai_msg.tool_calls}", flush=True)
+                
+                messages.append(ai_msg)
+                for tool_call in ai_msg.tool_calls:
+                    yield {
+                        "event": "tool_start",
+                        "data": {"id": tool_call["id"], "name": tool_call["name"], "args": tool_call["args"]}
+                    }
+                
+                # Run the calls concurrently and report each as it finishes
+                async def run(index, tool_call):
+                    return index, await self._execute_tool_call(tool_call)
+                
+                results = [None] * len(ai_msg.tool_calls)
+                for finished in asyncio.as_completed([run(i, call) for i, call in enumerate(ai_msg.tool_calls)]):
+                    index, (tool_message, urls) = await finished
+                    results[index] = (tool_message, urls)
+                    tool_call = ai_msg.tool_calls[index]
+                    yield {
+                        "event": "tool_end",
+                        "data": {"id": tool_call["id"], "name": tool_call["name"], "sources": urls}
+                    }
+                for tool_message, urls in results:
+                    sources.extend(urls)
+                    messages.append(tool_message)
+            
+            self._remember_turn(session_id, session_state, message, response_text)
+            print(f"[LangChain] Streamed response complete. Sources: {len(sources)}", flush=True)
+            
+            yield {"event": "done", "data": {"response": response_text, "sources": sources if sources else None}}
+            
+        except Exception as e:
+            print(f"[LangChain] Streaming error: {e}", flush=True)
+            import traceback
+            traceback.print_exc()
+            yield {"event": "error", "data": {"message": f"I apologize, but I encountered an error: {str(e)}"}}
+    
     def clear_chat_history(self, session_id: str = "default"):
         """Clear chat history for a session"""
-        if session_id in self.chat_histories:
-            del self.chat_histories[session_id]
+        self.chat_histories.delete(session_id)
     
-    async def analyze_transcript(self, transcript: str) -> Dict[str, Any]:
-        """Analyze transcript using LangChain (for backward compatibility)"""
-        prompt = f"""
-        You are an expert legal assistant analyzing a court hearing transcript. 
-        Analyze the following transcript and extract:
+    @staticmethod
+    def _parse_json_response(text: str) -> Dict[str, Any]:
+        # Extract JSON from markdown code blocks if present
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0].strip()
+        elif "```" in text:
+            text = text.split("```")[1].split("```")[0].strip()
+        return json.loads(text)
+    
+    async def _analyze_text(self, transcript: str, note: str = "") -> Dict[str, Any]:
+        """Run the analysis prompt on a transcript (or one segment of it) and parse the JSON"""
+        prompt = TRANSCRIPT_ANALYSIS_PROMPT.format(transcript=transcript)
+        if note:
+            prompt = note + prompt
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        return self._parse_json_response(response.content)
+    
+    @staticmethod
+    def _normalize_title(title: str) -> str:
+        return " ".join(re.findall(r"\w+", (title or "").lower()))
+    
+    @classmethod
+    def _is_same_item(cls, first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+        # Overlapping segments often report the same point under slightly different wording
+        a, b = cls._normalize_title(first.get("title")), cls._normalize_title(second.get("title"))
+        if not a or not b:
+            return False
+        if a == b:
+            return True
+        words_a, words_b = set(a.split()), set(b.split())
+        return len(words_a & words_b) / len(words_a | words_b) >= 0.75
+    
+    @classmethod
+    def _merge_items(cls, items: List[Dict[str, Any]], rank_field: str) -> List[Dict[str, Any]]:
+        """Deduplicate insights/action items, keeping the highest severity/priority and longest description"""
+        merged: List[Dict[str, Any]] = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            match = next((kept for kept in merged if cls._is_same_item(kept, item)), None)
+            if match is None:
+                merged.append(dict(item))
+                continue
+            if SEVERITY_RANK.get(str(item.get(rank_field, "")).lower(), -1) > \
+                    SEVERITY_RANK.get(str(match.get(rank_field, "")).lower(), -1):
+                match[rank_field] = item[rank_field]
+            if len(item.get("description") or "") > len(match.get("description") or ""):
+                match["description"] = item["description"]
+            for field, value in item.items():
+                if value and not match.get(field):
+                    match[field] = value
+        return merged
+    
+    async def _merge_summaries(self, summaries: List[str]) -> str:
+        if len(summaries) == 1:
+            return summaries[0]
+        numbered = "\n\n".join(f"Part {index}: {summary}" for index, summary in enumerate(summaries, 1))
+        try:
+            response = await self.llm.ainvoke([HumanMessage(content=SUMMARY_MERGE_PROMPT.format(summaries=numbered))])
+            return response.content.strip()
+        except Exception as e:
+            print(f"Error merging segment summaries: {e}", flush=True)
+            return "\n\n".join(summaries)
+    
+    async def _analyze_map_reduce(self, transcript: str) -> Dict[str, Any]:
+        """Analyze a long transcript segment by segment, then merge the results.
         
-        1. Summary: A concise summary of the hearing
-        2. Meeting Minutes: Detailed, legally relevant meeting minutes
-        3. Critical Points: Important motions, decisions, and legal arguments
-        4. Decisions: All judicial decisions made
-        5. Deadlines: Any mentioned dates or deadlines
-        6. Risk Areas: Potential legal risks or concerns
-        7. Action Items: Tasks, responsibilities, and follow-ups needed
+        Segments are analyzed concurrently (at most ANALYSIS_MAX_CONCURRENCY
+        LLM calls in flight), so latency follows the segment size rather than
+        the length of the hearing. Segments that fail are left out of the merge.
+        """
+        segments = RecursiveCharacterTextSplitter(
+            chunk_size=settings.ANALYSIS_SEGMENT_CHARS,
+            chunk_overlap=settings.ANALYSIS_SEGMENT_OVERLAP,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        ).split_text(transcript)
+        semaphore = asyncio.Semaphore(settings.ANALYSIS_MAX_CONCURRENCY)
         
-        Transcript:
-        {transcript}
+        async def analyze_segment(index: int, segment: str) -> Dict[str, Any]:
+            async with semaphore:
+                note = SEGMENT_ANALYSIS_NOTE.format(index=index, total=len(segments))
+                return await self._analyze_text(segment, note=note)
         
-        Return your analysis as a JSON object with the following structure:
-        {{
-            "summary": "...",
-            "minutes": "...",
-            "critical_points": [
-                {{"type": "critical_point", "title": "...", "description": "...", "severity": "high/medium/low", "timestamp": "..."}}
-            ],
-            "decisions": [
-                {{"type": "decision", "title": "...", "description": "...", "severity": "medium"}}
-            ],
-            "deadlines": [
-                {{"type": "deadline", "title": "...", "description": "...", "severity": "high", "timestamp": "..."}}
-            ],
-            "risk_areas": [
-                {{"type": "risk_area", "title": "...", "description": "...", "severity": "high/medium/low"}}
-            ],
-            "action_items": [
-                {{"title": "...", "description": "...", "assigned_to": "...", "priority": "high/medium/low", "due_date": "..."}}
-            ]
-        }}
-        """
+        print(f"Analyzing transcript in {len(segments)} segments", flush=True)
+        results = await asyncio.gather(
+            *(analyze_segment(index, segment) for index, segment in enumerate(segments, 1)),
+            return_exceptions=True
+        )
+        
+        parts = []
+        for index, result in enumerate(results, 1):
+            if isinstance(result, Exception) or not isinstance(result, dict):
+                print(f"Error analyzing transcript segment {index}/{len(segments)}: {result}", flush=True)
+                continue
+            parts.append((index, result))
+        if not parts:
+            raise ValueError("every transcript segment failed to analyze")
+        
+        merged = {
+            "summary": await self._merge_summaries([part.get("summary", "") for _, part in parts if part.get("summary")]),
+            "minutes": "\n\n".join(
+                f"Part {index} of {len(segments)}:\n{part['minutes']}" for index, part in parts if part.get("minutes")
+            ),
+            "action_items": self._merge_items(
+                [item for _, part in parts for item in part.get("action_items") or []], "priority"
+            )
+        }
+        for key in INSIGHT_KEYS:
+            merged[key] = self._merge_items([item for _, part in parts for item in part.get(key) or []], "severity")
+        merged["segments"] = {"total": len(segments), "analyzed": len(parts)}
+        return merged
+    
+    async def analyze_transcript(self, transcript: str) -> Dict[str, Any]:
+        """Analyze transcript using LangChain (for backward compatibility)"""
+        # Long hearings are split into segments analyzed concurrently (map-reduce)
+        map_reduce = len(transcript) > settings.ANALYSIS_MAP_REDUCE_THRESHOLD_CHARS
+        prompt_version = ANALYSIS_PROMPT_VERSION
+        if map_reduce:
+            prompt_version += f":segments-{settings.ANALYSIS_SEGMENT_CHARS}-{settings.ANALYSIS_SEGMENT_OVERLAP}"
+        
+        cache_key = None
+        if self.analysis_cache is not None:
+            cache_key = AnalysisCache.key(prompt_version, LLM_MODEL, transcript)
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                print("Transcript analysis served from cache", flush=True)
+                return cached
         
         try:
-            messages = [HumanMessage(content=prompt)]
-            response = await self.llm.ainvoke(messages)
-            text = response.content
-            
-            # Extract JSON from markdown code blocks if present
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
+            if map_reduce:
+                result = await self._analyze_map_reduce(transcript)
+            else:
+                result = await self._analyze_text(transcript)
             
-            result = json.loads(text)
+            # Only successful analyses are cached; failures are retried on the next upload
+            if cache_key is not None and not (map_reduce and result["segments"]["analyzed"] < result["segments"]["total"]):
+                self.analysis_cache.set(cache_key, result)
             return result
         except Exception as e:
             print(f"Error analyzing transcript: {e}", flush=True)
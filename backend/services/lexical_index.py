@@ -0,0 +1,153 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from services.vector_store import VectorMatch
+
+
+# Words that carry no signal for BM25 and only slow down OR queries
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for", "from",
+    "has", "have", "how", "in", "is", "it", "me", "of", "on", "or", "our", "that", "the",
+    "their", "there", "this", "to", "was", "were", "what", "when", "where", "which", "who",
+    "why", "will", "with", "you",
+}
+
+
+class LexicalIndex:
+    """BM25 full-text index over stored chunks, backed by SQLite FTS5.
+
+    Rows live in a regular ``chunks`` table (indexed by owner and case) and
+    an external-content FTS5 table kept in sync with triggers indexes their
+    text. Exact identifiers such as docket numbers, statute sections and
+    party names are matched here even when dense retrieval misses them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                vector_id TEXT UNIQUE NOT NULL,
+                owner_type TEXT NOT NULL,
+                owner_id INTEGER NOT NULL,
+                case_id INTEGER,
+                metadata TEXT NOT NULL,
+                body TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunks_owner ON chunks (owner_type, owner_id);
+            CREATE INDEX IF NOT EXISTS idx_chunks_case ON chunks (case_id);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                body, content='chunks', content_rowid='rowid'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts (rowid, body) VALUES (new.rowid, new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts (chunks_fts, rowid, body) VALUES ('delete', old.rowid, old.body);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def build_match_query(query: str) -> Optional[str]:
+        """Turn free text into an FTS5 OR-query of quoted terms.
+
+        Each whitespace-separated term is quoted so punctuation inside
+        identifiers (``CV-2024-001``, ``12(b)(6)``) becomes a phrase match
+        instead of FTS5 syntax.
+        """
+        terms = []
+        for raw in query.split():
+            term = raw.strip(".,;:!?\"'")
+            if not term or term.lower() in STOPWORDS or not re.search(r"\w", term):
+                continue
+            terms.append('"' + term.replace('"', '""') + '"')
+        if not terms:
+            return None
+        return " OR ".join(dict.fromkeys(terms))
+
+    def replace_owner(
+        self,
+        owner_type: str,
+        owner_id: int,
+        case_id: int,
+        entries: List[Dict[str, Any]]
+    ):
+        """Replace every indexed chunk of a meeting/document.
+
+        Only the raw chunk ``content`` is indexed: the title/case header that is
+        embedded with every chunk would otherwise match every chunk of an owner
+        and inflate their BM25 scores alike.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE owner_type = ? AND owner_id = ?",
+                (owner_type, owner_id)
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks (vector_id, owner_type, owner_id, case_id, metadata, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (entry["id"], owner_type, owner_id, case_id, json.dumps(entry["metadata"]), entry["content"])
+                    for entry in entries
+                ]
+            )
+            self._conn.commit()
+
+    def delete_owner(self, owner_type: str, owner_id: int):
+        """Remove every indexed chunk of a meeting/document"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE owner_type = ? AND owner_id = ?",
+                (owner_type, owner_id)
+            )
+            self._conn.commit()
+
+    def delete_case(self, case_id: int):
+        """Remove every indexed chunk of a case"""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE case_id = ?", (case_id,))
+            self._conn.commit()
+
+    def search(self, query: str, case_id: int = None, top_k: int = 10) -> List[VectorMatch]:
+        """Return the top_k chunks by BM25 score (higher is better)"""
+        match_query = self.build_match_query(query)
+        if match_query is None:
+            return []
+
+        sql = (
+            "SELECT c.vector_id, c.metadata, bm25(chunks_fts) AS rank "
+            "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+            "WHERE chunks_fts MATCH ?"
+        )
+        params: List[Any] = [match_query]
+        if case_id:
+            sql += " AND c.case_id = ?"
+            params.append(case_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(top_k)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        # FTS5's bm25() is negative with lower meaning more relevant
+        return [
+            VectorMatch(id=vector_id, score=-rank, metadata=json.loads(metadata))
+            for vector_id, metadata, rank in rows
+        ]
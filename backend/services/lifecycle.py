@@ -0,0 +1,52 @@
+from typing import Any, Dict
+from config import get_settings
+from services.gemini_service import gemini_service
+from services.pinecone_service import pinecone_service
+from services.langchain_gemini_service import langchain_gemini_service
+
+settings = get_settings()
+
+
+# Services whose first use is expensive (model loading, network connections)
+HEAVY_SERVICES = {
+    "vector_search": pinecone_service,
+    "llm": langchain_gemini_service,
+}
+
+
+def warm_up_services():
+    """Initialize heavy services ahead of the first request.
+    
+    Failures are logged rather than raised: each service still initializes
+    lazily on first use, so a worker without network access can start.
+    """
+    for name, service in HEAVY_SERVICES.items():
+        try:
+            service.warm_up()
+            print(f"[Startup] {name} ready", flush=True)
+        except Exception as e:
+            print(f"[Startup] Warm-up failed for {name}: {e}", flush=True)
+
+
+def open_exclusive_stores():
+    """Open stores that only one process may use, so a conflicting worker fails at startup.
+    
+    The local vector store is locked by the process that opens it; without
+    this check a second worker would start and only fail on its first search.
+    """
+    if settings.VECTOR_STORE_BACKEND.lower() == "local":
+        pinecone_service.index
+
+
+def service_readiness() -> Dict[str, bool]:
+    """Report which heavy services are initialized"""
+    return {name: service.is_ready for name, service in HEAVY_SERVICES.items()}
+
+
+def service_metrics() -> Dict[str, Any]:
+    """Collect runtime statistics (cache hit rates, etc.) from services"""
+    return {
+        "vector_search": pinecone_service.get_stats(),
+        "llm": langchain_gemini_service.get_stats(),
+        "gemini": gemini_service.get_stats()
+    }
@@ -0,0 +1,176 @@
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, with LSH band keys for candidate lookup.
+
+    Two chunks' Jaccard similarity (over their sets of ``shingle_size``-word
+    shingles) is estimated by the fraction of equal signature slots. Chunks
+    sharing any band key are candidates; ``bands`` x ``rows`` must equal
+    ``num_perm`` and sets the similarity at which candidates start to appear,
+    roughly (1 / bands) ** (1 / rows).
+    """
+
+    PRIME = (1 << 31) - 1  # Keeps a * x + b inside uint64 for 31-bit a, b and x
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 5, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self.PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, self.PRIME, size=num_perm).astype(np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", text.lower())
+        if len(words) <= self.shingle_size:
+            grams = {" ".join(words)}
+        else:
+            grams = {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+        return np.fromiter(
+            (zlib.crc32(gram.encode("utf-8")) & self.PRIME for gram in grams), dtype=np.uint64, count=len(grams)
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self._shingles(text)
+        hashes = (self._a[:, None] * shingles[None, :] + self._b[:, None]) % self.PRIME
+        return hashes.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        return [
+            f"{band}:{zlib.crc32(signature[band * self.rows:(band + 1) * self.rows].tobytes()):08x}"
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        return float(np.mean(first == second))
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of the canonical (embedded) chunks of each case.
+
+    Backed by a local SQLite file: signatures are stored per vector and their
+    LSH band keys are indexed by case, so looking up near-duplicates of a new
+    chunk only touches chunks of the same case that share a band.
+    """
+
+    def __init__(self, path: str, hasher: MinHasher, threshold: float):
+        self.path = path
+        self.hasher = hasher
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                vector_id TEXT PRIMARY KEY,
+                owner_type TEXT NOT NULL,
+                owner_id INTEGER NOT NULL,
+                case_id INTEGER,
+                signature BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_signatures_owner ON signatures (owner_type, owner_id);
+            CREATE INDEX IF NOT EXISTS idx_signatures_case ON signatures (case_id);
+
+            CREATE TABLE IF NOT EXISTS bands (
+                case_id INTEGER,
+                band_key TEXT NOT NULL,
+                vector_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bands_lookup ON bands (case_id, band_key);
+            CREATE INDEX IF NOT EXISTS idx_bands_vector ON bands (vector_id);
+            """
+        )
+        self._conn.commit()
+
+    def find(
+        self,
+        case_id: int,
+        signature: np.ndarray,
+        exclude_ids: Iterable[str] = ()
+    ) -> Optional[Tuple[str, float]]:
+        """Most similar stored chunk of the case at or above the threshold, as (vector_id, similarity)"""
+        keys = self.hasher.band_keys(signature)
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT s.vector_id, s.signature FROM bands b "
+                f"JOIN signatures s ON s.vector_id = b.vector_id "
+                f"WHERE b.case_id IS ? AND b.band_key IN ({placeholders})",
+                [case_id, *keys]
+            ).fetchall()
+
+        excluded = set(exclude_ids)
+        best = None
+        for vector_id, blob in rows:
+            if vector_id in excluded:
+                continue
+            similarity = self.hasher.similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (vector_id, similarity)
+        return best
+
+    def add(self, owner_type: str, owner_id: int, case_id: int, items: List[Tuple[str, np.ndarray]]):
+        """Record signatures of canonical chunks of a meeting/document"""
+        with self._lock:
+            self._insert(owner_type, owner_id, case_id, items)
+            self._conn.commit()
+
+    def replace_owner(self, owner_type: str, owner_id: int, case_id: int, items: List[Tuple[str, np.ndarray]]):
+        """Replace the canonical chunk signatures of a meeting/document"""
+        with self._lock:
+            self._delete_where("owner_type = ? AND owner_id = ?", (owner_type, owner_id))
+            self._insert(owner_type, owner_id, case_id, items)
+            self._conn.commit()
+
+    def _insert(self, owner_type: str, owner_id: int, case_id: int, items: List[Tuple[str, np.ndarray]]):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO signatures (vector_id, owner_type, owner_id, case_id, signature) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(vector_id, owner_type, owner_id, case_id, signature.tobytes()) for vector_id, signature in items]
+        )
+        self._conn.executemany(
+            "INSERT INTO bands (case_id, band_key, vector_id) VALUES (?, ?, ?)",
+            [
+                (case_id, key, vector_id)
+                for vector_id, signature in items
+                for key in self.hasher.band_keys(signature)
+            ]
+        )
+
+    def _delete_where(self, condition: str, params: tuple):
+        self._conn.execute(
+            f"DELETE FROM bands WHERE vector_id IN (SELECT vector_id FROM signatures WHERE {condition})",
+            params
+        )
+        self._conn.execute(f"DELETE FROM signatures WHERE {condition}", params)
+
+    def delete_owner(self, owner_type: str, owner_id: int):
+        """Forget the signatures of a meeting/document"""
+        with self._lock:
+            self._delete_where("owner_type = ? AND owner_id = ?", (owner_type, owner_id))
+            self._conn.commit()
+
+    def delete_case(self, case_id: int):
+        """Forget the signatures of every chunk in a case"""
+        with self._lock:
+            self._delete_where("case_id = ?", (case_id,))
+            self._conn.commit()
@@ -1,66 +1,590 @@
-from pinecone import Pinecone, ServerlessSpec
 from config import get_settings
+import asyncio
 import hashlib
-from typing import List, Dict, Any
-from sentence_transformers import SentenceTransformer
+import re
+import threading
+import time
+from typing import List, Dict, Any, Optional
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from services.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from services.embedding_worker import EmbeddingWorkerPool
+from services.embedding_backends import backend_id, load_embedding_model
+from services.vector_store import VectorMatch, VectorStoreLockedError, case_namespace, create_vector_store
+from services.lexical_index import LexicalIndex
+from services.chunk_manifest import chunk_manifest
+from services.chunk_store import ChunkStore
+from services.near_duplicates import MinHasher, NearDuplicateIndex
 
 
 settings = get_settings()
 
+# Caller-supplied metadata copied onto vectors; everything else stays out of the index
+VECTOR_METADATA_FIELDS = ("title", "case_number")
+
+# Tokens shaped like legal identifiers, which BM25 matches exactly and embeddings blur
+IDENTIFIER_PATTERNS = (
+    re.compile(r"§"),  # statute sections: § 1983
+    re.compile(r"\b\d+(?:\([a-z0-9]{1,4}\))+", re.IGNORECASE),  # rule subsections: 12(b)(6)
+    re.compile(r"\b\d{1,2}:\d{2}-[a-z]{2,4}-\d+", re.IGNORECASE),  # federal dockets: 1:23-cv-04567
+    re.compile(r"\b[a-z]{1,5}-\d{2,}", re.IGNORECASE),  # case/exhibit numbers: CV-2024-001, PX-101
+    re.compile(r"\b\d{2,4}-\d{3,}"),  # docket numbers: 23-1234, 2024-0173
+    re.compile(r"\b(?:exhibit|exh?\.)\s*[a-z]{0,2}-?\d+", re.IGNORECASE),  # Exhibit 12, Ex. A-3
+    re.compile(r"\b[Ee]xhibit\s+[A-Z]{1,2}\b"),  # Exhibit B, Exhibit AA
+)
+
 
 class PineconeService:
     def __init__(self):
-        self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-        self.index_name = settings.PINECONE_INDEX_NAME
         # Use all-MiniLM-L6-v2: 384 dimensions, fast, free, runs locally
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model_name = 'all-MiniLM-L6-v2'
         self.embedding_dimension = 384
         self.embedding_enabled = True
         
+        # PyTorch or ONNX Runtime (optionally int8-quantized), see EMBEDDING_BACKEND
+        self.embedding_backend = backend_id()
+        self._encode_stats = {"texts": 0, "seconds": 0.0}
+        # Encoding and dedup counters are updated from embedding worker threads
+        self._stats_lock = threading.Lock()
+        
+        # The model and vector store are created on first use (or by warm_up at startup)
+        # so importing this module stays cheap and works without network access
+        self._model = None
+        self._index = None
+        self._init_lock = threading.RLock()
+        
+        # Content-addressed embedding cache so re-uploaded text is never re-encoded
+        self.embedding_cache = None
+        if settings.EMBEDDING_CACHE_ENABLED:
+            try:
+                self.embedding_cache = EmbeddingCache(
+                    model_name=self.embedding_model_id,
+                    path=settings.EMBEDDING_CACHE_PATH,
+                    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES
+                )
+            except Exception as e:
+                print(f"Error opening embedding cache: {e}")
+        
+        # Embedding and chunking run on dedicated threads so they never block the event loop
+        self.embedding_pool = EmbeddingWorkerPool(
+            workers=settings.EMBEDDING_WORKERS,
+            max_queue_size=settings.EMBEDDING_QUEUE_SIZE
+        )
+        
+        # Recent query embeddings, so repeated chat questions skip the encoder entirely
+        self.query_embedding_cache = QueryEmbeddingCache(settings.QUERY_EMBEDDING_CACHE_SIZE)
+        
+        # BM25 full-text index over the same chunks, for hybrid retrieval
+        self.lexical_index = None
+        if settings.LEXICAL_INDEX_ENABLED:
+            try:
+                self.lexical_index = LexicalIndex(settings.LEXICAL_INDEX_PATH)
+            except Exception as e:
+                print(f"Error opening lexical index: {e}")
+        
+        # Full chunk text lives locally; vectors only carry compact filter fields
+        self.chunk_store = ChunkStore(
+            settings.CHUNK_STORE_PATH,
+            compression_level=settings.CHUNK_STORE_COMPRESSION_LEVEL
+        )
+        
+        # MinHash index of canonical chunks per case, so repeated boilerplate isn't embedded twice
+        self.near_duplicates = None
+        self._dedup_stats = {"chunks": 0, "duplicates": 0}
+        if settings.NEAR_DUPLICATE_MODE != "off":
+            try:
+                self.near_duplicates = NearDuplicateIndex(
+                    settings.NEAR_DUPLICATE_INDEX_PATH,
+                    MinHasher(),
+                    threshold=settings.NEAR_DUPLICATE_THRESHOLD
+                )
+            except Exception as e:
+                print(f"Error opening near-duplicate index: {e}")
+        
         # Initialize text splitter for chunking long transcripts
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,  # Max characters per chunk
-            chunk_overlap=200,  # Overlap to maintain context
+            chunk_size=settings.CHUNK_SIZE,  # Max characters per chunk
+            chunk_overlap=settings.CHUNK_OVERLAP,  # Overlap to maintain context
             length_function=len,
             separators=["\n\n", "\n", ". ", " ", ""]  # Try to split at natural boundaries
         )
-        
-        self._ensure_index()
 
-    def _ensure_index(self):
-        """Ensure the Pinecone index exists"""
-        try:
-            existing_indexes = [index.name for index in self.pc.list_indexes()]
-            
-            if self.index_name not in existing_indexes:
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=self.embedding_dimension,  # MiniLM dimension
-                    metric='cosine',
-                    spec=ServerlessSpec(
-                        cloud='aws',
-                        region='us-east-1'
-                    )
-                )
-            
-            self.index = self.pc.Index(self.index_name)
-        except Exception as e:
-            print(f"Error ensuring index: {e}")
-            self.index = None
+    @property
+    def model(self):
+        """SentenceTransformer model, loaded on first use"""
+        if self._model is None:
+            with self._init_lock:
+                if self._model is None:
+                    # Imported lazily: pulling in torch alone takes several seconds
+                    try:
+                        self._model = load_embedding_model(self.model_name)
+                    except Exception as e:
+                        if self.embedding_backend == "torch":
+                            raise
+                        # ONNX Runtime/optimum missing or export failed: keep serving on PyTorch
+                        print(f"Error loading {self.embedding_backend} embedding backend, using torch: {e}")
+                        self._model = load_embedding_model(self.model_name, backend="torch")
+                        self.embedding_backend = "torch"
+                        if self.embedding_cache is not None:
+                            self.embedding_cache.model_name = self.embedding_model_id
+        return self._model
+
+    @property
+    def embedding_model_id(self) -> str:
+        """Identity of the embedding model, used to key cached embeddings"""
+        if self.embedding_backend == "torch":
+            return self.model_name
+        return f"{self.model_name}:{self.embedding_backend}"
+
+    @property
+    def index(self):
+        """Configured vector store backend (Pinecone or local), created on first use"""
+        if self._index is None:
+            with self._init_lock:
+                if self._index is None:
+                    try:
+                        self._index = create_vector_store(self.embedding_dimension)
+                    except VectorStoreLockedError:
+                        # Another process owns the local store; serving without search would be silent
+                        raise
+                    except Exception as e:
+                        # Left unset so the next call retries
+                        print(f"Error initializing vector store: {e}")
+        return self._index
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the embedding model is loaded and the vector store is connected"""
+        return self._model is not None and self._index is not None and self._index.is_ready
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache and index statistics for the /metrics endpoint"""
+        with self._stats_lock:
+            encode_stats = dict(self._encode_stats)
+            dedup_stats = dict(self._dedup_stats)
+        return {
+            "query_embedding_cache": self.query_embedding_cache.stats(),
+            "embedding_pool": self.embedding_pool.stats(),
+            "encoder": {
+                "backend": self.embedding_backend,
+                "texts_encoded": encode_stats["texts"],
+                "encode_seconds": round(encode_stats["seconds"], 3),
+                "texts_per_second": round(encode_stats["texts"] / encode_stats["seconds"], 2)
+                if encode_stats["seconds"] else None
+            },
+            "embedding_cache_entries": len(self.embedding_cache) if self.embedding_cache is not None else 0,
+            "near_duplicates": {
+                "mode": settings.NEAR_DUPLICATE_MODE if self.near_duplicates is not None else "off",
+                "chunks_seen": dedup_stats["chunks"],
+                "duplicates": dedup_stats["duplicates"],
+                "dedup_ratio": round(dedup_stats["duplicates"] / dedup_stats["chunks"], 4)
+                if dedup_stats["chunks"] else 0.0
+            }
+        }
+
+    def warm_up(self):
+        """Load the embedding model and connect to the vector store ahead of the first request"""
+        self.model.encode("warm up", convert_to_tensor=False)
+        if self.index:
+            self.index.warm_up()
 
     def _generate_embedding(self, text: str) -> List[float]:
         """Generate embeddings using local sentence-transformers model"""
         if not self.embedding_enabled:
             return None
+        
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                return cached
             
         try:
             # Generate embedding locally - no API calls, no quota limits!
-            embedding = self.model.encode(text, convert_to_tensor=False)
-            return embedding.tolist()
+            embedding = self._encode_batch([text])[0]
         except Exception as e:
             print(f"Error generating embedding: {e}")
             return None
+        
+        if self.embedding_cache is not None:
+            self.embedding_cache.set(text, embedding)
+        return embedding
+
+    async def _embed_query(self, query: str) -> List[float]:
+        """Embed a search query, serving repeats from the in-memory LRU cache"""
+        embedding = self.query_embedding_cache.get(query)
+        if embedding is None:
+            # Interactive priority: jumps ahead of queued bulk ingestion batches
+            embedding = await self.embedding_pool.run(
+                self._generate_embedding, query, priority=EmbeddingWorkerPool.INTERACTIVE
+            )
+            self.query_embedding_cache.set(query, embedding)
+        return embedding
+
+    def _encode_batch(self, batch: List[str]) -> List[List[float]]:
+        """Encode one batch of texts (runs on an embedding worker thread)"""
+        model = self.model
+        start = time.perf_counter()
+        embeddings = model.encode(batch, batch_size=len(batch), convert_to_tensor=False)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._encode_stats["seconds"] += elapsed
+            self._encode_stats["texts"] += len(batch)
+        return [embedding.tolist() for embedding in embeddings]
+
+    async def _generate_embeddings(
+        self,
+        texts: List[str],
+        batch_size: int = None,
+        priority: int = EmbeddingWorkerPool.BULK
+    ) -> List[List[float]]:
+        """Generate embeddings for many texts using batched encode calls on the worker pool"""
+        if not self.embedding_enabled:
+            return [None] * len(texts)
+        
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        
+        # Serve what we can from the cache and only encode each missing text once
+        cached = self.embedding_cache.get_many(texts) if self.embedding_cache is not None else {}
+        missing = [text for text in dict.fromkeys(texts) if text not in cached]
+        
+        # Each batch is a separate job so interactive queries can run between batches,
+        # and a single failing batch doesn't lose the whole document
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        results = await asyncio.gather(
+            *(self.embedding_pool.run(self._encode_batch, batch, priority=priority) for batch in batches),
+            return_exceptions=True
+        )
+        
+        computed = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                print(f"Error generating embeddings for a batch of {len(batch)} texts: {result}")
+                continue
+            computed.update(zip(batch, result))
+        
+        if self.embedding_cache is not None and computed:
+            self.embedding_cache.set_many(computed)
+        
+        if texts:
+            print(f"Embedded {len(texts)} texts: {len(texts) - len(missing)} from cache, {len(computed)} encoded")
+        
+        return [cached.get(text, computed.get(text)) for text in texts]
+
+    async def _split_text(self, text: str) -> List[str]:
+        """Chunk text on the worker pool; splitting a long filing is CPU-bound"""
+        return await self.embedding_pool.run(self.text_splitter.split_text, text)
+
+    @staticmethod
+    def _namespace(case_id: int) -> Optional[str]:
+        """Vector namespace holding a case's vectors (None is the shared default namespace)"""
+        if settings.VECTOR_NAMESPACE_PER_CASE and case_id:
+            return case_namespace(case_id)
+        return None
+
+    @staticmethod
+    def _owner_filter(owner_type: str, owner_id: int) -> Dict[str, Any]:
+        """Metadata filter matching every vector a meeting/document stores"""
+        if owner_type == "meeting":
+            return {"meeting_id": owner_id, "type": {"$in": ["transcript_chunk", "insights_summary"]}}
+        return {"document_id": owner_id, "type": "case_document"}
+
+    @staticmethod
+    def _vector_metadata(fields: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact vector metadata: filter fields plus the labels shown in search results"""
+        return {
+            **{key: metadata[key] for key in VECTOR_METADATA_FIELDS if metadata.get(key) is not None},
+            **fields
+        }
+
+    @staticmethod
+    def _content_hash(metadata_context: str, content: str) -> str:
+        """Hash a chunk together with the metadata header it is embedded with"""
+        return hashlib.sha256(f"{metadata_context}\0{content}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _embedding_text(metadata_context: str, label: str, content: str) -> str:
+        """Text embedded for a chunk: its metadata header (if any) and the chunk itself.
+        
+        The chunk's position is left out on purpose: a chunk that only moved keeps
+        its content-hash ID and vector, so nothing positional may be baked into it.
+        Positions live in the chunk manifest.
+        """
+        if not metadata_context:
+            return content
+        return f"{metadata_context}\n\n{label}:\n{content}"
+
+    @staticmethod
+    def _chunk_offsets(text: str, chunks: List[str]) -> List[tuple]:
+        """Locate each chunk in the source text as (start, end) character offsets.
+        
+        Chunks come out of the splitter in order and overlap, so each search
+        starts just after the previous chunk's start.
+        """
+        offsets = []
+        search_from = 0
+        for chunk in chunks:
+            start = text.find(chunk, search_from)
+            if start == -1:
+                offsets.append((None, None))
+                continue
+            offsets.append((start, start + len(chunk)))
+            search_from = start + 1
+        return offsets
+
+    @staticmethod
+    def _assign_chunk_ids(prefix: str, entries: List[Dict[str, Any]]):
+        """Give each chunk entry a content-addressed vector ID.
+        
+        IDs are derived from the chunk hash rather than its position, so an edit
+        early in a transcript doesn't change the IDs of every chunk after it.
+        Repeated identical chunks get an occurrence suffix.
+        """
+        seen = {}
+        for entry in entries:
+            short_hash = entry["content_hash"][:16]
+            occurrence = seen.get(short_hash, 0)
+            seen[short_hash] = occurrence + 1
+            entry["id"] = f"{prefix}_chunk_{short_hash}" + (f"_{occurrence}" if occurrence else "")
+
+    def _classify_duplicates(
+        self,
+        owner_type: str,
+        owner_id: int,
+        case_id: int,
+        entries: List[Dict[str, Any]],
+        existing: Dict[str, str],
+        existing_aliases: Dict[str, str]
+    ):
+        """Mark near-duplicate chunks with ``alias_of`` and attach MinHash signatures.
+        
+        A chunk is compared with the canonical chunks of the same case already
+        indexed (other meetings/documents) and with the canonical chunks of this
+        owner seen so far. Unchanged canonical chunks stay canonical so their
+        vectors, and any aliases pointing at them, are left alone.
+        """
+        hasher = self.near_duplicates.hasher
+        batch_bands: Dict[str, List[str]] = {}
+        batch_signatures: Dict[str, Any] = {}
+        
+        def remember(entry):
+            batch_signatures[entry["id"]] = entry["signature"]
+            for key in hasher.band_keys(entry["signature"]):
+                batch_bands.setdefault(key, []).append(entry["id"])
+        
+        eligible = [entry for entry in entries if entry["chunk_type"] != "insights_summary"]
+        for entry in eligible:
+            entry["signature"] = hasher.signature(entry["content"])
+        
+        # Unchanged canonical chunks keep their vectors
+        pending = []
+        for entry in eligible:
+            if existing.get(entry["id"]) == entry["content_hash"] and entry["id"] not in existing_aliases:
+                remember(entry)
+            else:
+                pending.append(entry)
+        
+        for entry in pending:
+            signature = entry["signature"]
+            best = None
+            candidates = {vector_id for key in hasher.band_keys(signature) for vector_id in batch_bands.get(key, ())}
+            for vector_id in candidates:
+                similarity = hasher.similarity(signature, batch_signatures[vector_id])
+                if similarity >= self.near_duplicates.threshold and (best is None or similarity > best[1]):
+                    best = (vector_id, similarity)
+            if best is None:
+                # This owner's previous vectors are being replaced, so they can't be targets
+                best = self.near_duplicates.find(case_id, signature, exclude_ids=existing)
+            
+            if best is None:
+                remember(entry)
+            else:
+                entry["alias_of"] = best[0]
+                entry["extra_data"] = {**(entry.get("extra_data") or {}), "vector_metadata": entry["metadata"]}
+
+    def _promote_aliases(self, vector_ids: List[str], namespace: str = None, exclude_owner: tuple = None) -> int:
+        """Give near-duplicates of vectors about to be deleted a vector of their own.
+        
+        For each deleted canonical vector, its first alias in another
+        meeting/document takes over the embedding (fetched, not recomputed) and
+        the remaining aliases are re-pointed at it.
+        """
+        if self.near_duplicates is None or not vector_ids:
+            return 0
+        
+        aliases = [
+            alias for alias in chunk_manifest.get_aliases_of(vector_ids)
+            if (alias["owner_type"], alias["owner_id"]) != exclude_owner
+        ]
+        if not aliases:
+            return 0
+        
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for alias in aliases:
+            groups.setdefault(alias["alias_of"], []).append(alias)
+        canonical_vectors = {
+            vector["id"]: vector
+            for i in range(0, len(groups), 100)
+            for vector in self.index.fetch(list(groups)[i:i + 100], namespace=namespace)
+        }
+        
+        vectors_to_upsert = []
+        updates: Dict[str, Optional[str]] = {}
+        promoted = []
+        for target_id, members in groups.items():
+            vector = canonical_vectors.get(target_id)
+            if vector is None:
+                continue
+            heir, rest = members[0], members[1:]
+            vectors_to_upsert.append({
+                "id": heir["id"],
+                "values": vector["values"],
+                "metadata": (heir["extra_data"] or {}).get("vector_metadata", {})
+            })
+            updates[heir["id"]] = None
+            updates.update({member["id"]: heir["id"] for member in rest})
+            promoted.append(heir)
+        
+        if vectors_to_upsert:
+            self.index.upsert(vectors_to_upsert, namespace=namespace)
+            chunk_manifest.set_aliases(updates)
+            contents = self.chunk_store.get_many(heir["id"] for heir in promoted)
+            for heir in promoted:
+                if heir["id"] in contents:
+                    self.near_duplicates.add(
+                        heir["owner_type"], heir["owner_id"], heir["case_id"],
+                        [(heir["id"], self.near_duplicates.hasher.signature(contents[heir["id"]]))]
+                    )
+        return len(vectors_to_upsert)
+
+    async def _index_chunks(
+        self,
+        owner_type: str,
+        owner_id: int,
+        case_id: int,
+        entries: List[Dict[str, Any]],
+        incremental: bool = None
+    ) -> Dict[str, Any]:
+        """Embed and upsert chunk entries for a meeting/document and sync its manifest.
+        
+        Each entry is a dict with ``id``, ``content_hash``, ``text`` (what gets
+        embedded), ``content`` (the raw chunk kept in the chunk store),
+        ``chunk_type``, ``chunk_index`` and compact vector ``metadata``.
+        In incremental mode only new or changed chunks are embedded and upserted;
+        in either mode vectors that no longer belong to the owner are deleted.
+        Near-duplicates of chunks already in the case are aliased to them or
+        skipped (NEAR_DUPLICATE_MODE) instead of being embedded again.
+        """
+        if incremental is None:
+            incremental = settings.INCREMENTAL_INDEXING
+        
+        previous = chunk_manifest.get_chunks(owner_type, owner_id)
+        existing = {chunk["id"]: chunk["content_hash"] for chunk in previous}
+        existing_aliases = {chunk["id"]: chunk["alias_of"] for chunk in previous if chunk["alias_of"]}
+        
+        dedup_mode = settings.NEAR_DUPLICATE_MODE if self.near_duplicates is not None else "off"
+        total_chunks = len(entries)
+        duplicates = 0
+        if dedup_mode != "off":
+            self._classify_duplicates(owner_type, owner_id, case_id, entries, existing, existing_aliases)
+            duplicates = sum(1 for entry in entries if entry.get("alias_of"))
+            with self._stats_lock:
+                self._dedup_stats["chunks"] += len(entries)
+                self._dedup_stats["duplicates"] += duplicates
+            if dedup_mode == "skip":
+                entries = [entry for entry in entries if not entry.get("alias_of")]
+        
+        canonical = [entry for entry in entries if not entry.get("alias_of")]
+        current_ids = {entry["id"] for entry in canonical}
+        
+        if incremental:
+            to_embed = [
+                entry for entry in canonical
+                if existing.get(entry["id"]) != entry["content_hash"] or entry["id"] in existing_aliases
+            ]
+        else:
+            to_embed = canonical
+        stale_ids = [
+            vector_id for vector_id in existing
+            if vector_id not in current_ids and vector_id not in existing_aliases
+        ]
+        
+        # Generate all embeddings in batches
+        embeddings = await self._generate_embeddings([entry["text"] for entry in to_embed])
+        
+        vectors_to_upsert = []
+        failed_ids = set()
+        for entry, embedding in zip(to_embed, embeddings):
+            if embedding is None:
+                print(f"Failed to generate embedding for {entry['id']}")
+                failed_ids.add(entry["id"])
+                continue
+            
+            vectors_to_upsert.append({
+                "id": entry["id"],
+                "values": embedding,
+                "metadata": entry["metadata"]
+            })
+        
+        namespace = self._namespace(case_id)
+        if not previous and await asyncio.to_thread(self._has_legacy_vectors, owner_type, owner_id, namespace):
+            # Indexed before the manifest existed: clear the old positional-ID vectors
+            # before the content-hash IDs replace them
+            await asyncio.to_thread(self._delete_legacy_vectors, self._owner_filter(owner_type, owner_id), namespace)
+        
+        # Upsert batches concurrently with retries; failures are reported, not fatal
+        upsert_result = await self.index.upsert_batches(vectors_to_upsert, namespace=namespace)
+        failed_ids.update(upsert_result.failed_ids)
+        
+        # Aliases of a chunk that failed to store have nothing to point at; retry them next time
+        failed_ids.update(entry["id"] for entry in entries if entry.get("alias_of") in failed_ids)
+        
+        # Remove vectors for chunks that vanished from the content, handing any
+        # near-duplicates in other meetings/documents a vector of their own first
+        promoted = 0
+        if stale_ids:
+            promoted = await asyncio.to_thread(
+                self._promote_aliases, stale_ids, namespace, (owner_type, owner_id)
+            )
+            await asyncio.to_thread(self.index.delete, ids=stale_ids, namespace=namespace)
+        
+        # Record what is now stored. Failed new chunks are left out; failed updates of
+        # an existing vector keep its old hash. Either way the next update retries them.
+        stored_entries = []
+        for entry in entries:
+            if entry["id"] not in failed_ids:
+                stored_entries.append(entry)
+            elif entry["id"] in existing and entry["id"] not in existing_aliases and not entry.get("alias_of"):
+                stored_entries.append({**entry, "content_hash": existing[entry["id"]]})
+        chunk_manifest.replace(owner_type, owner_id, case_id, stored_entries)
+        
+        # Keep the chunk text, full-text and near-duplicate indexes in sync with the vector store
+        indexed_entries = [entry for entry in entries if entry["id"] not in failed_ids]
+        self.chunk_store.replace_owner(
+            owner_type, owner_id, case_id, indexed_entries,
+            keep_ids=[entry["id"] for entry in stored_entries]
+        )
+        if self.lexical_index:
+            self.lexical_index.replace_owner(owner_type, owner_id, case_id, indexed_entries)
+        if dedup_mode != "off":
+            self.near_duplicates.replace_owner(owner_type, owner_id, case_id, [
+                (entry["id"], entry["signature"]) for entry in stored_entries
+                if "signature" in entry and not entry.get("alias_of")
+            ])
+        
+        return {
+            "total_chunks": total_chunks,
+            "embedded": len(vectors_to_upsert),
+            "upserted": upsert_result.upserted_count,
+            "unchanged": len(canonical) - len(to_embed),
+            "duplicates": duplicates,
+            "dedup_mode": dedup_mode,
+            "dedup_ratio": round(duplicates / total_chunks, 4) if total_chunks else 0.0,
+            "deleted": len(stale_ids),
+            "promoted": promoted,
+            "failed": len(failed_ids),
+            "failed_ids": sorted(failed_ids),
+            "upsert_retries": upsert_result.retries,
+            "errors": upsert_result.errors
+        }
 
     async def store_meeting_content(
         self,
@@ -68,11 +592,12 @@ class PineconeService:
         case_id: int,
         transcript: str,
         insights: List[Dict[str, Any]],
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        incremental: bool = None
     ):
-        """Store meeting content in Pinecone with chunking for long transcripts"""
+        """Store meeting content in the vector store with chunking for long transcripts"""
         if not self.index:
-            print("Pinecone index not available - skipping vector storage")
+            print("Vector store not available - skipping vector storage")
             return
         
         if not self.embedding_enabled:
@@ -81,7 +606,7 @@ class PineconeService:
 
         try:
             meeting_metadata = metadata or {}
-            vectors_to_upsert = []
+            entries = []
             
             # 1. Create metadata header for context
             metadata_header = []
@@ -89,41 +614,34 @@ class PineconeService:
                 metadata_header.append(f"Meeting Title: {meeting_metadata['title']}")
             if meeting_metadata.get('case_number'):
                 metadata_header.append(f"Case Number: {meeting_metadata['case_number']}")
-            metadata_context = "\n".join(metadata_header)
+            metadata_context = "\n".join(metadata_header) if settings.CHUNK_METADATA_HEADER else ""
             
             # 2. Chunk the transcript using RecursiveCharacterTextSplitter
-            transcript_chunks = self.text_splitter.split_text(transcript)
+            transcript_chunks = await self._split_text(transcript)
             
             print(f"Split transcript into {len(transcript_chunks)} chunks for meeting {meeting_id}")
             
-            # 3. Store each chunk as a separate vector
+            # 3. Describe each chunk as a separate vector
+            offsets = self._chunk_offsets(transcript, transcript_chunks)
             for chunk_idx, chunk in enumerate(transcript_chunks):
-                # Prepend metadata context to each chunk for better semantic understanding
-                chunk_with_context = f"{metadata_context}\n\nTranscript Part {chunk_idx + 1}:\n{chunk}"
-                
-                # Generate embedding for this chunk
-                embedding = self._generate_embedding(chunk_with_context)
-                
-                if embedding is None:
-                    print(f"Failed to generate embedding for chunk {chunk_idx} of meeting {meeting_id}")
-                    continue
-                
-                # Create vector with unique ID for each chunk
-                vector = {
-                    "id": f"meeting_{meeting_id}_chunk_{chunk_idx}",
-                    "values": embedding,
-                    "metadata": {
+                entries.append({
+                    "content_hash": self._content_hash(metadata_context, chunk),
+                    # Prepend metadata context to each chunk for better semantic understanding
+                    "text": self._embedding_text(metadata_context, "Transcript", chunk),
+                    "content": chunk,
+                    "chunk_type": "transcript_chunk",
+                    "chunk_index": chunk_idx,
+                    "start_offset": offsets[chunk_idx][0],
+                    "end_offset": offsets[chunk_idx][1],
+                    "chunk_length": len(chunk),
+                    "preview": chunk[:100],
+                    "metadata": self._vector_metadata({
                         "meeting_id": meeting_id,
                         "case_id": case_id,
-                        "type": "transcript_chunk",
-                        "chunk_index": chunk_idx,
-                        "total_chunks": len(transcript_chunks),
-                        "content": chunk[:1000],  # Store first 1000 chars for preview
-                        "chunk_length": len(chunk),
-                        **(metadata or {})
-                    }
-                }
-                vectors_to_upsert.append(vector)
+                        "type": "transcript_chunk"
+                    }, meeting_metadata)
+                })
+            self._assign_chunk_ids(f"meeting_{meeting_id}", entries)
             
             # 4. Create a summary vector with insights
             if insights:
@@ -136,217 +654,391 @@ class PineconeService:
                     insights_summary += f"- [{insight_type.upper()}] {title}: {description} (Severity: {severity})\n"
                 
                 # Combine metadata with insights for summary vector
-                summary_content = f"{metadata_context}\n\n{insights_summary}"
-                summary_embedding = self._generate_embedding(summary_content)
-                
-                if summary_embedding:
-                    summary_vector = {
-                        "id": f"meeting_{meeting_id}_summary",
-                        "values": summary_embedding,
-                        "metadata": {
-                            "meeting_id": meeting_id,
-                            "case_id": case_id,
-                            "type": "insights_summary",
-                            "content": insights_summary[:1000],
-                            "insights_count": len(insights),
-                            **(metadata or {})
-                        }
-                    }
-                    vectors_to_upsert.append(summary_vector)
+                entries.append({
+                    "id": f"meeting_{meeting_id}_summary",
+                    "content_hash": self._content_hash(metadata_context, insights_summary),
+                    "text": f"{metadata_context}\n\n{insights_summary}",
+                    "content": insights_summary,
+                    "chunk_type": "insights_summary",
+                    "chunk_index": None,
+                    "chunk_length": len(insights_summary),
+                    "preview": insights_summary[:100],
+                    "extra_data": {"insights_count": len(insights)},
+                    "metadata": self._vector_metadata({
+                        "meeting_id": meeting_id,
+                        "case_id": case_id,
+                        "type": "insights_summary"
+                    }, meeting_metadata)
+                })
             
-            # 5. Upsert all vectors in batch (Pinecone supports batch upsert)
-            if vectors_to_upsert:
-                # Upsert in batches of 100 (Pinecone best practice)
-                batch_size = 100
-                for i in range(0, len(vectors_to_upsert), batch_size):
-                    batch = vectors_to_upsert[i:i + batch_size]
-                    self.index.upsert(vectors=batch)
-                
-                print(f"Successfully stored meeting {meeting_id}: {len(transcript_chunks)} transcript chunks + {1 if insights else 0} summary vector = {len(vectors_to_upsert)} total vectors")
-            else:
-                print(f"No vectors created for meeting {meeting_id}")
+            # 5. Embed and upsert new/changed vectors, remove vanished ones
+            stats = await self._index_chunks("meeting", meeting_id, case_id, entries, incremental)
+            
+            print(f"Stored meeting {meeting_id}: {stats['total_chunks']} vectors "
+                  f"({stats['upserted']} upserted, {stats['unchanged']} unchanged, "
+                  f"{stats['duplicates']} near-duplicates, {stats['deleted']} deleted, {stats['failed']} failed)")
+            return stats
                 
         except Exception as e:
             print(f"Error storing meeting content: {e}")
 
-    async def search_similar_content(
-        self,
-        query: str,
-        case_id: int = None,
-        top_k: int = 5
-    ) -> List[Dict[str, Any]]:
-        """Search for similar content in Pinecone across all chunks"""
-        if not self.index:
-            print("Pinecone index not available")
-            return []
+    @staticmethod
+    def _is_identifier_query(query: str) -> bool:
+        """Short queries naming docket numbers, statute sections, exhibits, etc.
         
-        if not self.embedding_enabled:
-            print("Embeddings disabled due to quota - search unavailable")
-            return []
+        A digit alone is not enough: "what happened on March 15" is a question
+        for dense retrieval, "CV-2024-001 hearing" is a lookup.
+        """
+        return 0 < len(query.split()) <= 6 and any(pattern.search(query) for pattern in IDENTIFIER_PATTERNS)
 
-        try:
-            # Generate query embedding
-            query_embedding = self._generate_embedding(query)
-            
-            if query_embedding is None:
-                return []
-            
-            # Build filter
-            filter_dict = {}
-            if case_id:
-                filter_dict["case_id"] = case_id
-            
-            # Search with higher top_k to get multiple relevant chunks
-            # We'll return more results since content is now chunked
-            search_top_k = top_k * 3  # Get 3x results to cover multiple chunks from same meeting
-            
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=search_top_k,
-                include_metadata=True,
-                filter=filter_dict if filter_dict else None
+    @staticmethod
+    def _fuse_rankings(rankings: List[List[VectorMatch]], k: int = 60) -> List[VectorMatch]:
+        """Combine ranked match lists with reciprocal rank fusion"""
+        fused: Dict[str, VectorMatch] = {}
+        for matches in rankings:
+            for rank, match in enumerate(matches):
+                if match.id not in fused:
+                    fused[match.id] = VectorMatch(id=match.id, score=0.0, metadata=match.metadata)
+                fused[match.id].score += 1.0 / (k + rank + 1)
+        return sorted(fused.values(), key=lambda match: match.score, reverse=True)
+
+    async def _dense_query(self, vector: List[float], top_k: int, case_id: int = None) -> List[VectorMatch]:
+        """Nearest vectors, scoped to a case by namespace or by metadata filter"""
+        if not settings.VECTOR_NAMESPACE_PER_CASE:
+            return await asyncio.to_thread(
+                self.index.query,
+                vector=vector,
+                top_k=top_k,
+                filter={"case_id": case_id} if case_id else None
+            )
+        
+        if case_id:
+            # Only this case's partition is searched, however large the rest of the corpus is
+            return await asyncio.to_thread(
+                self.index.query, vector=vector, top_k=top_k, namespace=self._namespace(case_id)
             )
+        
+        # Cross-case search fans out over every case namespace plus the default one
+        namespaces = [None] + [self._namespace(known_case_id) for known_case_id in chunk_manifest.get_case_ids()]
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self.index.query, vector=vector, top_k=top_k, namespace=namespace)
+            for namespace in namespaces
+        ))
+        matches = [match for namespace_matches in results for match in namespace_matches]
+        return sorted(matches, key=lambda match: match.score, reverse=True)[:top_k]
+
+    def _group_matches(self, matches: List[VectorMatch], top_k: int) -> List[Dict[str, Any]]:
+        """Group chunk-level matches into one result per meeting/document"""
+        # Group results by content type (document or meeting) and their IDs
+        content_results = {}
+        for match in matches:
+            content_type = match.metadata.get("type", "transcript_chunk")
             
-            # Group results by content type (document or meeting) and their IDs
-            content_results = {}
-            for match in results.matches:
-                content_type = match.metadata.get("type", "transcript_chunk")
+            if content_type == "case_document":
+                # Group by document_id for documents
+                document_id = match.metadata.get("document_id")
+                content_key = f"document_{document_id}"
                 
-                if content_type == "case_document":
-                    # Group by document_id for documents
-                    document_id = match.metadata.get("document_id")
-                    content_key = f"document_{document_id}"
-                    
-                    if content_key not in content_results:
-                        content_results[content_key] = {
-                            "id": content_key,
+                if content_key not in content_results:
+                    content_results[content_key] = {
+                        "id": content_key,
+                        "document_id": document_id,
+                        "score": match.score,
+                        "chunks": [],
+                        "metadata": {
+                            "type": "case_document",
+                            "case_id": match.metadata.get("case_id"),
+                            "title": match.metadata.get("title"),
                             "document_id": document_id,
-                            "score": match.score,
-                            "chunks": [],
-                            "metadata": {
-                                "type": "case_document",
-                                "case_id": match.metadata.get("case_id"),
-                                "title": match.metadata.get("title"),
-                                "document_id": document_id,
-                            }
                         }
-                else:
-                    # Group by meeting_id for transcripts
-                    meeting_id = match.metadata.get("meeting_id")
-                    content_key = f"meeting_{meeting_id}"
-                    
-                    if content_key not in content_results:
-                        content_results[content_key] = {
-                            "id": content_key,
+                    }
+            else:
+                # Group by meeting_id for transcripts
+                meeting_id = match.metadata.get("meeting_id")
+                content_key = f"meeting_{meeting_id}"
+                
+                if content_key not in content_results:
+                    content_results[content_key] = {
+                        "id": content_key,
+                        "meeting_id": meeting_id,
+                        "score": match.score,
+                        "chunks": [],
+                        "metadata": {
+                            "type": "transcript_chunk",
+                            "case_id": match.metadata.get("case_id"),
+                            "title": match.metadata.get("title"),
+                            "case_number": match.metadata.get("case_number"),
                             "meeting_id": meeting_id,
-                            "score": match.score,
-                            "chunks": [],
-                            "metadata": {
-                                "type": "transcript_chunk",
-                                "case_id": match.metadata.get("case_id"),
-                                "title": match.metadata.get("title"),
-                                "case_number": match.metadata.get("case_number"),
-                                "meeting_id": meeting_id,
-                            }
                         }
-                
-                # Add this chunk to the content's chunks
-                content_results[content_key]["chunks"].append({
-                    "score": match.score,
-                    "content": match.metadata.get("content", ""),
-                    "type": match.metadata.get("type", ""),
-                    "chunk_index": match.metadata.get("chunk_index"),
-                })
-                
-                # Update score to be the maximum (most relevant chunk)
-                content_results[content_key]["score"] = max(
-                    content_results[content_key]["score"],
-                    match.score
-                )
+                    }
+            
+            # Add this chunk to the content's chunks
+            content_results[content_key]["chunks"].append({
+                "id": match.id,
+                "score": match.score,
+                "type": match.metadata.get("type", ""),
+                # Vectors stored before the chunk store existed carry a 1000-char preview
+                "fallback_content": match.metadata.get("content", ""),
+            })
             
-            # Convert to list and sort by best score
-            aggregated_results = sorted(
-                content_results.values(),
-                key=lambda x: x["score"],
-                reverse=True
+            # Update score to be the maximum (most relevant chunk)
+            content_results[content_key]["score"] = max(
+                content_results[content_key]["score"],
+                match.score
             )
+        
+        # Convert to list and sort by best score
+        aggregated_results = sorted(
+            content_results.values(),
+            key=lambda x: x["score"],
+            reverse=True
+        )
+        
+        # Limit to original top_k items (documents + meetings combined)
+        aggregated_results = aggregated_results[:top_k]
+        
+        # Hydrate chunk text for the returned results in one bulk local read
+        contents = self.chunk_store.get_many(
+            chunk["id"] for result in aggregated_results for chunk in result["chunks"]
+        )
+        
+        # Format final results
+        final_results = []
+        for result in aggregated_results:
+            # Combine content from all chunks
+            all_content = "\n\n".join([
+                contents.get(chunk["id"], chunk["fallback_content"])
+                for chunk in sorted(result["chunks"], key=lambda x: x["score"], reverse=True)
+            ])
             
-            # Limit to original top_k items (documents + meetings combined)
-            aggregated_results = aggregated_results[:top_k]
+            final_results.append({
+                "id": result["id"],
+                "score": result["score"],
+                "content": all_content,  # Limit combined content
+                "metadata": {
+                    **result["metadata"],
+                    "chunks_found": len(result["chunks"]),
+                    "chunk_scores": [chunk["score"] for chunk in result["chunks"]]
+                }
+            })
+        
+        return final_results
+
+    def _resolve_search_mode(self, mode: str) -> Optional[str]:
+        """Downgrade a search mode to what is available, or None if search is unavailable"""
+        if mode != "dense" and not self.lexical_index:
+            mode = "dense"
+        
+        if mode != "lexical":
+            if not self.index:
+                print("Vector store not available")
+                return None
             
-            # Format final results
-            final_results = []
-            for result in aggregated_results:
-                # Combine content from all chunks
-                all_content = "\n\n".join([
-                    chunk["content"] 
-                    for chunk in sorted(result["chunks"], key=lambda x: x["score"], reverse=True)
-                ])
-                
-                final_results.append({
-                    "id": result["id"],
-                    "score": result["score"],
-                    "content": all_content,  # Limit combined content
-                    "metadata": {
-                        **result["metadata"],
-                        "chunks_found": len(result["chunks"]),
-                        "chunk_scores": [chunk["score"] for chunk in result["chunks"]]
-                    }
-                })
+            if not self.embedding_enabled:
+                print("Embeddings disabled due to quota - search unavailable")
+                return None
+        return mode
+
+    async def _search_matches(
+        self,
+        query: str,
+        case_id: int,
+        search_top_k: int,
+        mode: str,
+        query_embedding: List[float] = None
+    ) -> List[VectorMatch]:
+        """Chunk-level matches for one query; query_embedding may be precomputed"""
+        lexical_matches = []
+        if mode in ("lexical", "hybrid"):
+            lexical_matches = self.lexical_index.search(query, case_id=case_id, top_k=search_top_k)
             
-            return final_results
+            # Identifier-style questions are answered by exact term matches;
+            # skip embedding the query when BM25 already found enough
+            if mode == "hybrid" and self._is_identifier_query(query) and len(lexical_matches) >= search_top_k:
+                mode = "lexical"
+        
+        dense_matches = []
+        if mode in ("dense", "hybrid"):
+            # Generate query embedding
+            if query_embedding is None:
+                query_embedding = await self._embed_query(query)
+            
+            if query_embedding is None:
+                return []
+            
+            dense_matches = await self._dense_query(query_embedding, search_top_k, case_id)
+        
+        if mode == "hybrid":
+            return self._fuse_rankings([dense_matches, lexical_matches], k=settings.HYBRID_RRF_K)
+        if mode == "lexical":
+            return lexical_matches
+        return dense_matches
+
+    async def search_similar_content(
+        self,
+        query: str,
+        case_id: int = None,
+        top_k: int = 5,
+        mode: str = "dense"
+    ) -> List[Dict[str, Any]]:
+        """Search for similar content across all chunks
+        
+        mode: "dense" (vector similarity), "lexical" (BM25 full-text) or
+        "hybrid" (both, fused with reciprocal rank fusion)
+        """
+        mode = self._resolve_search_mode(mode)
+        if mode is None:
+            return []
+
+        try:
+            # Search with higher top_k to get multiple relevant chunks
+            # We'll return more results since content is now chunked
+            search_top_k = top_k * settings.SEARCH_OVERSAMPLE_FACTOR  # Cover multiple chunks from same meeting
+            
+            matches = await self._search_matches(query, case_id, search_top_k, mode)
+            return self._group_matches(matches, top_k)
             
         except Exception as e:
             print(f"Error searching content: {e}")
             return []
 
+    async def _embed_queries(self, queries: List[str]) -> Dict[str, List[float]]:
+        """Embed many search queries with batched encode calls, using the query LRU cache"""
+        embeddings = {}
+        missing = []
+        for query in dict.fromkeys(queries):
+            embedding = self.query_embedding_cache.get(query)
+            if embedding is None:
+                missing.append(query)
+            else:
+                embeddings[query] = embedding
+        
+        if missing:
+            computed = await self._generate_embeddings(missing, priority=EmbeddingWorkerPool.INTERACTIVE)
+            for query, embedding in zip(missing, computed):
+                if embedding is not None:
+                    self.query_embedding_cache.set(query, embedding)
+                    embeddings[query] = embedding
+        return embeddings
+
+    async def search_many(
+        self,
+        queries: List[str],
+        case_id: int = None,
+        top_k: int = 5,
+        mode: str = "dense"
+    ) -> List[Dict[str, Any]]:
+        """Run many searches at once: one batched embedding pass, then concurrent lookups
+        
+        Returns one ``{"query", "results"}`` entry per query, in input order,
+        with results grouped exactly like ``search_similar_content``.
+        """
+        mode = self._resolve_search_mode(mode)
+        if mode is None:
+            return [{"query": query, "results": []} for query in queries]
+        
+        search_top_k = top_k * settings.SEARCH_OVERSAMPLE_FACTOR
+        embeddings = {}
+        if mode != "lexical":
+            embeddings = await self._embed_queries(queries)
+        
+        semaphore = asyncio.Semaphore(settings.SEARCH_BATCH_CONCURRENCY)
+        
+        async def search_one(query: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    if mode == "dense" and query not in embeddings:
+                        return []
+                    matches = await self._search_matches(
+                        query, case_id, search_top_k, mode, query_embedding=embeddings.get(query)
+                    )
+                    return self._group_matches(matches, top_k)
+                except Exception as e:
+                    print(f"Error searching content for query '{query[:50]}': {e}")
+                    return []
+        
+        results = await asyncio.gather(*(search_one(query) for query in queries))
+        return [{"query": query, "results": grouped} for query, grouped in zip(queries, results)]
+
+    def _has_legacy_vectors(self, owner_type: str, owner_id: int, namespace: str = None) -> bool:
+        """Whether an owner still has vectors under the positional IDs used before the manifest"""
+        return bool(self.index.fetch([f"{owner_type}_{owner_id}_chunk_0"], namespace=namespace))
+    
+    def _delete_legacy_vectors(self, owner_filter: Dict[str, Any], namespace: str = None):
+        """Delete an owner's vectors by metadata filter.
+        
+        Vectors stored before the chunk manifest or content-hash IDs existed
+        (``meeting_5_chunk_0``) are not in the manifest and can only be found
+        by metadata.
+        """
+        try:
+            self.index.delete(filter=owner_filter, namespace=namespace)
+        except Exception as e:
+            print(f"Error deleting vectors by filter {owner_filter}: {e}")
+    
+    def _delete_vectors(self, vector_ids: List[str], fallback_filter: Dict[str, Any], namespace: str = None):
+        """Delete vectors by explicit ID, falling back to a metadata filter for unmanifested data"""
+        if not vector_ids:
+            self._delete_legacy_vectors(fallback_filter, namespace)
+            return
+        
+        # Pinecone accepts at most 1000 IDs per delete call
+        batch_size = 1000
+        for i in range(0, len(vector_ids), batch_size):
+            self.index.delete(ids=vector_ids[i:i + batch_size], namespace=namespace)
+
     async def delete_meeting_content(self, meeting_id: int):
         """Delete all vectors related to a meeting"""
         if not self.index:
             return
 
         try:
-            # Delete by prefix - this will delete all chunks and summary for this meeting
-            self.index.delete(filter={"meeting_id": meeting_id})
-            print(f"Deleted all vectors for meeting {meeting_id}")
+            # Delete every chunk and the summary for this meeting by ID, from the manifest
+            vector_ids = chunk_manifest.get_vector_ids("meeting", meeting_id)
+            namespace = self._namespace(chunk_manifest.get_case_id("meeting", meeting_id))
+            # Vector store calls go over the network, so keep them off the event loop
+            await asyncio.to_thread(self._promote_aliases, vector_ids, namespace, ("meeting", meeting_id))
+            await asyncio.to_thread(self._delete_vectors, vector_ids, {"meeting_id": meeting_id}, namespace)
+            chunk_manifest.delete("meeting", meeting_id)
+            self.chunk_store.delete_owner("meeting", meeting_id)
+            if self.near_duplicates is not None:
+                self.near_duplicates.delete_owner("meeting", meeting_id)
+            if self.lexical_index:
+                self.lexical_index.delete_owner("meeting", meeting_id)
+            print(f"Deleted {len(vector_ids)} vectors for meeting {meeting_id}")
         except Exception as e:
             print(f"Error deleting meeting content: {e}")
     
     async def get_meeting_chunks_info(self, meeting_id: int) -> Dict[str, Any]:
         """Get information about how a meeting was chunked"""
-        if not self.index:
-            return {"error": "Index not available"}
-        
         try:
-            # Query for all vectors of this meeting
-            results = self.index.query(
-                vector=[0.0] * self.embedding_dimension,  # Dummy vector
-                top_k=10000,  # Large number to get all chunks
-                filter={"meeting_id": meeting_id},
-                include_metadata=True
-            )
+            # Served from the local chunk manifest - no vector store round trip
+            manifest = chunk_manifest.get_chunks("meeting", meeting_id)
             
             chunks_info = {
                 "meeting_id": meeting_id,
-                "total_vectors": len(results.matches),
+                "total_vectors": len(manifest),
                 "chunks": [],
                 "summary_vectors": []
             }
             
-            for match in results.matches:
-                metadata = match.metadata
-                if metadata.get("type") == "transcript_chunk":
+            for entry in manifest:
+                if entry["chunk_type"] == "transcript_chunk":
                     chunks_info["chunks"].append({
-                        "id": match.id,
-                        "chunk_index": metadata.get("chunk_index"),
-                        "length": metadata.get("chunk_length"),
-                        "preview": metadata.get("content", "")[:100]
+                        "id": entry["id"],
+                        "chunk_index": entry["chunk_index"],
+                        "start_offset": entry["start_offset"],
+                        "end_offset": entry["end_offset"],
+                        "length": entry["chunk_length"],
+                        "content_hash": entry["content_hash"],
+                        "alias_of": entry["alias_of"],
+                        "preview": entry["preview"] or ""
                     })
-                elif metadata.get("type") == "insights_summary":
+                elif entry["chunk_type"] == "insights_summary":
                     chunks_info["summary_vectors"].append({
-                        "id": match.id,
-                        "insights_count": metadata.get("insights_count"),
-                        "preview": metadata.get("content", "")[:100]
+                        "id": entry["id"],
+                        "insights_count": (entry["extra_data"] or {}).get("insights_count"),
+                        "preview": entry["preview"] or ""
                     })
             
             return chunks_info
@@ -360,11 +1052,12 @@ class PineconeService:
         document_id: int,
         case_id: int,
         content: str,
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        incremental: bool = None
     ):
-        """Store case document content in Pinecone with chunking"""
+        """Store case document content in the vector store with chunking"""
         if not self.index:
-            print("Pinecone index not available - skipping vector storage")
+            print("Vector store not available - skipping vector storage")
             return
         
         if not self.embedding_enabled:
@@ -373,7 +1066,7 @@ class PineconeService:
 
         try:
             doc_metadata = metadata or {}
-            vectors_to_upsert = []
+            entries = []
             
             # Create metadata header for context
             metadata_header = []
@@ -383,49 +1076,41 @@ class PineconeService:
                 metadata_header.append(f"Case: {doc_metadata['case_number']}")
             if doc_metadata.get('client_side'):
                 metadata_header.append(f"Client Side: {doc_metadata['client_side']}")
-            metadata_context = "\n".join(metadata_header)
+            metadata_context = "\n".join(metadata_header) if settings.CHUNK_METADATA_HEADER else ""
             
             # Chunk the document content
-            content_chunks = self.text_splitter.split_text(content)
+            content_chunks = await self._split_text(content)
             
             print(f"Split document into {len(content_chunks)} chunks for document {document_id}")
             
-            # Store each chunk as a separate vector
+            # Describe each chunk as a separate vector
+            offsets = self._chunk_offsets(content, content_chunks)
             for chunk_idx, chunk in enumerate(content_chunks):
-                chunk_with_context = f"{metadata_context}\n\nDocument Content Part {chunk_idx + 1}:\n{chunk}"
-                
-                embedding = self._generate_embedding(chunk_with_context)
-                
-                if embedding is None:
-                    print(f"Failed to generate embedding for chunk {chunk_idx} of document {document_id}")
-                    continue
-                
-                vector = {
-                    "id": f"document_{document_id}_chunk_{chunk_idx}",
-                    "values": embedding,
-                    "metadata": {
+                entries.append({
+                    "content_hash": self._content_hash(metadata_context, chunk),
+                    "text": self._embedding_text(metadata_context, "Document Content", chunk),
+                    "content": chunk,
+                    "chunk_type": "case_document",
+                    "chunk_index": chunk_idx,
+                    "start_offset": offsets[chunk_idx][0],
+                    "end_offset": offsets[chunk_idx][1],
+                    "chunk_length": len(chunk),
+                    "preview": chunk[:100],
+                    "metadata": self._vector_metadata({
                         "document_id": document_id,
                         "case_id": case_id,
-                        "type": "case_document",
-                        "chunk_index": chunk_idx,
-                        "total_chunks": len(content_chunks),
-                        "content": chunk[:1000],
-                        "chunk_length": len(chunk),
-                        **(metadata or {})
-                    }
-                }
-                vectors_to_upsert.append(vector)
+                        "type": "case_document"
+                    }, doc_metadata)
+                })
+            self._assign_chunk_ids(f"document_{document_id}", entries)
             
-            # Upsert in batches
-            if vectors_to_upsert:
-                batch_size = 100
-                for i in range(0, len(vectors_to_upsert), batch_size):
-                    batch = vectors_to_upsert[i:i + batch_size]
-                    self.index.upsert(vectors=batch)
-                
-                print(f"Successfully stored document {document_id}: {len(content_chunks)} chunks")
-            else:
-                print(f"No vectors created for document {document_id}")
+            # Embed and upsert new/changed vectors, remove vanished ones
+            stats = await self._index_chunks("document", document_id, case_id, entries, incremental)
+            
+            print(f"Stored document {document_id}: {stats['total_chunks']} chunks "
+                  f"({stats['upserted']} upserted, {stats['unchanged']} unchanged, "
+                  f"{stats['duplicates']} near-duplicates, {stats['deleted']} deleted, {stats['failed']} failed)")
+            return stats
                 
         except Exception as e:
             print(f"Error storing case document: {e}")
@@ -436,8 +1121,18 @@ class PineconeService:
             return
 
         try:
-            self.index.delete(filter={"document_id": document_id})
-            print(f"Deleted all vectors for document {document_id}")
+            vector_ids = chunk_manifest.get_vector_ids("document", document_id)
+            namespace = self._namespace(chunk_manifest.get_case_id("document", document_id))
+            # Vector store calls go over the network, so keep them off the event loop
+            await asyncio.to_thread(self._promote_aliases, vector_ids, namespace, ("document", document_id))
+            await asyncio.to_thread(self._delete_vectors, vector_ids, {"document_id": document_id}, namespace)
+            chunk_manifest.delete("document", document_id)
+            self.chunk_store.delete_owner("document", document_id)
+            if self.near_duplicates is not None:
+                self.near_duplicates.delete_owner("document", document_id)
+            if self.lexical_index:
+                self.lexical_index.delete_owner("document", document_id)
+            print(f"Deleted {len(vector_ids)} vectors for document {document_id}")
         except Exception as e:
             print(f"Error deleting document content: {e}")
     
@@ -447,8 +1142,21 @@ class PineconeService:
             return
 
         try:
-            self.index.delete(filter={"case_id": case_id})
-            print(f"Deleted all vectors for case {case_id}")
+            vector_ids = chunk_manifest.get_vector_ids(case_id=case_id)
+            if settings.VECTOR_NAMESPACE_PER_CASE:
+                # The case's vectors are its namespace, plus any stored in the default
+                # namespace before namespaces were enabled and never migrated
+                await asyncio.to_thread(self.index.delete_namespace, self._namespace(case_id))
+                await asyncio.to_thread(self._delete_legacy_vectors, {"case_id": case_id})
+            else:
+                await asyncio.to_thread(self._delete_vectors, vector_ids, {"case_id": case_id})
+            chunk_manifest.delete_case(case_id)
+            self.chunk_store.delete_case(case_id)
+            if self.near_duplicates is not None:
+                self.near_duplicates.delete_case(case_id)
+            if self.lexical_index:
+                self.lexical_index.delete_case(case_id)
+            print(f"Deleted {len(vector_ids)} vectors for case {case_id}")
         except Exception as e:
             print(f"Error deleting case content: {e}")
 
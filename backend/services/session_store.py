@@ -0,0 +1,315 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import get_settings
+from database import SessionLocal
+from models import ChatHistory
+from services.sqlite_cache import SQLiteCache
+
+settings = get_settings()
+
+
+def load_recent_turns(session_id: str, limit: int) -> List[Tuple[str, str]]:
+    """The last ``limit`` (user_message, bot_response) exchanges saved for a session, oldest first"""
+    db = SessionLocal()
+    try:
+        rows = db.query(ChatHistory.user_message, ChatHistory.bot_response).filter(
+            ChatHistory.session_id == session_id
+        ).order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc()).limit(limit).all()
+        return [(user_message or "", bot_response or "") for user_message, bot_response in reversed(rows)]
+    finally:
+        db.close()
+
+
+class SessionBackend(ABC):
+    """Interface shared by every chat-session state backend.
+
+    A backend maps session IDs to session state. When a session is missing
+    (new, evicted or expired), ``get`` asks the loader to rebuild it, e.g.
+    from the ChatHistory table, and stores the result. The SQLite and Redis
+    backends are shared between worker processes and need JSON-serializable
+    state; the in-process ``SessionStore`` holds any object.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Any]] = None):
+        self.loader = loader
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rehydrated = 0
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _rehydrate(self, session_id: str, loader: Optional[Callable[[str], Any]]) -> Any:
+        loader = loader or self.loader
+        if loader is None:
+            return None
+        value = loader(session_id)
+        if value is not None:
+            with self._stats_lock:
+                self.rehydrated += 1
+            self.set(session_id, value)
+        return value
+
+    def _lookup_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "rehydrated": self.rehydrated
+            }
+
+    @abstractmethod
+    def get(self, session_id: str, loader: Optional[Callable[[str], Any]] = None) -> Any:
+        """Return a session's state, rebuilding it with the loader if it is missing.
+
+        ``loader`` overrides the backend's default loader for this call.
+        """
+
+    @abstractmethod
+    def set(self, session_id: str, value: Any):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Forget a session (it may still be rehydrated later)"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class SessionStore(SessionBackend):
+    """In-process chat session state, bounded by count, idle time and approximate size.
+
+    Sessions are kept in least-recently-used order. Once a limit is exceeded
+    the least recently used sessions are evicted; sessions idle for longer
+    than ``ttl_seconds`` are evicted on the next access. ``sizer`` estimates
+    the bytes held by a session and is re-evaluated on every ``set``, so
+    callers that mutate a session in place should ``set`` it again afterwards.
+
+    When a session is not in memory, ``get`` asks ``loader`` to rebuild it
+    (e.g. from the ChatHistory table), so eviction only costs a database read.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: int = 0,
+        sizer: Callable[[Any], int] = lambda value: 0,
+        loader: Optional[Callable[[str], Any]] = None
+    ):
+        super().__init__(loader)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self._lock = threading.Lock()
+        # session_id -> (value, size, last_used)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = {"lru": 0, "ttl": 0, "memory": 0}
+
+    def _expire_idle(self, now: float):
+        if self.ttl_seconds is None:
+            return
+        # Oldest use first, so stop at the first session that is still fresh
+        while self._entries:
+            session_id, (_, size, last_used) = next(iter(self._entries.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            del self._entries[session_id]
+            self._bytes -= size
+            self.evictions["ttl"] += 1
+
+    def _enforce_limits(self, keep: str):
+        while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+            session_id = next(iter(self._entries))
+            if session_id == keep:
+                # A single session larger than the whole budget still stays usable
+                break
+            reason = "lru" if len(self._entries) > self.max_entries else "memory"
+            _, size, _ = self._entries.pop(session_id)
+            self._bytes -= size
+            self.evictions[reason] += 1
+
+    def get(self, session_id: str, loader: Optional[Callable[[str], Any]] = None) -> Any:
+        now = time.time()
+        with self._lock:
+            self._expire_idle(now)
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                value, size, _ = entry
+                self._entries[session_id] = (value, size, now)
+                self._entries.move_to_end(session_id)
+        self._count(hit=entry is not None)
+        if entry is not None:
+            return entry[0]
+        return self._rehydrate(session_id, loader)
+
+    def set(self, session_id: str, value: Any):
+        """Store (or refresh the size of) a session's state"""
+        size = self.sizer(value)
+        now = time.time()
+        with self._lock:
+            previous = self._entries.pop(session_id, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[session_id] = (value, size, now)
+            self._bytes += size
+            self._expire_idle(now)
+            self._enforce_limits(keep=session_id)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire_idle(time.time())
+            return {
+                "backend": "memory",
+                "sessions": len(self._entries),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._bytes,
+                "max_bytes": self.max_bytes or None,
+                **self._lookup_stats(),
+                "evictions": dict(self.evictions)
+            }
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Chat session state as JSON in a SQLite file shared by the workers of one host.
+
+    Sessions expire ``ttl_seconds`` after their last update and the least
+    recently used are evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        ttl_seconds: Optional[int] = None,
+        loader: Optional[Callable[[str], Any]] = None
+    ):
+        super().__init__(loader)
+        self._cache = SQLiteCache(path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, session_id: str, loader: Optional[Callable[[str], Any]] = None) -> Any:
+        value = self._cache.get(session_id)
+        self._count(hit=value is not None)
+        if value is not None:
+            return json.loads(value.decode("utf-8"))
+        return self._rehydrate(session_id, loader)
+
+    def set(self, session_id: str, value: Any):
+        self._cache.set(session_id, json.dumps(value).encode("utf-8"))
+
+    def delete(self, session_id: str):
+        self._cache.delete(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "sqlite",
+            "max_entries": self._cache.max_entries,
+            "ttl_seconds": self._cache.ttl_seconds,
+            **self._lookup_stats()
+        }
+
+
+class RedisSessionBackend(SessionBackend):
+    """Chat session state as JSON in Redis (or a Redis-compatible server such as Valkey).
+
+    Every read or write pushes the session's expiry ``ttl_seconds`` into the
+    future, so idle sessions expire; the server's maxmemory policy bounds
+    the total. Needs the ``redis`` package.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: Optional[int] = None,
+        key_prefix: str = "lexicase:chat-session:",
+        loader: Optional[Callable[[str], Any]] = None
+    ):
+        import redis
+
+        super().__init__(loader)
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    def get(self, session_id: str, loader: Optional[Callable[[str], Any]] = None) -> Any:
+        key = self.key_prefix + session_id
+        value = self._client.get(key)
+        self._count(hit=value is not None)
+        if value is not None:
+            if self.ttl_seconds:
+                self._client.expire(key, self.ttl_seconds)
+            return json.loads(value)
+        return self._rehydrate(session_id, loader)
+
+    def set(self, session_id: str, value: Any):
+        self._client.set(self.key_prefix + session_id, json.dumps(value), ex=self.ttl_seconds or None)
+
+    def delete(self, session_id: str):
+        self._client.delete(self.key_prefix + session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl_seconds,
+            **self._lookup_stats()
+        }
+
+
+def create_session_backend(
+    sizer: Callable[[Any], int] = lambda value: 0,
+    loader: Optional[Callable[[str], Any]] = None
+) -> SessionBackend:
+    """Build the chat-session backend selected by CHAT_SESSION_BACKEND"""
+    backend = settings.CHAT_SESSION_BACKEND.lower()
+    if backend == "memory":
+        return SessionStore(
+            max_entries=settings.CHAT_SESSION_MAX_ENTRIES,
+            ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+            max_bytes=settings.CHAT_SESSION_MAX_BYTES,
+            sizer=sizer,
+            loader=loader
+        )
+    if backend == "sqlite":
+        return SQLiteSessionBackend(
+            settings.CHAT_SESSION_SQLITE_PATH,
+            max_entries=settings.CHAT_SESSION_MAX_ENTRIES,
+            ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+            loader=loader
+        )
+    if backend == "redis":
+        return RedisSessionBackend(
+            settings.CHAT_SESSION_REDIS_URL,
+            ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+            loader=loader
+        )
+    raise ValueError(f"Unknown CHAT_SESSION_BACKEND: {settings.CHAT_SESSION_BACKEND}")
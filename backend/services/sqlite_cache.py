@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class SQLiteCache:
+    """Persistent key/value cache backed by a single SQLite file.
+
+    Entries are evicted least-recently-used first once ``max_entries`` is
+    exceeded, and optionally expire ``ttl_seconds`` after they were written.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache (accessed_at)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for a key, or None on a miss"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return cached values for all keys that are present and not expired"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        found: Dict[str, bytes] = {}
+        expired: List[str] = []
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value, created_at FROM cache WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, value, created_at in rows:
+                    if self._is_expired(created_at, now):
+                        expired.append(key)
+                    else:
+                        found[key] = value
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+            if expired:
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in expired])
+                self._count -= len(expired)
+            if found or expired:
+                self._conn.commit()
+
+        return found
+
+    def set(self, key: str, value: bytes):
+        """Store a single value"""
+        self.set_many([(key, value)])
+
+    def set_many(self, items: List[Tuple[str, bytes]]):
+        """Store many values in one transaction and evict down to max_entries"""
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            existing = 0
+            keys = list(dict.fromkeys(key for key, _ in items))
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                existing += self._conn.execute(
+                    f"SELECT COUNT(*) FROM cache WHERE key IN ({placeholders})",
+                    batch
+                ).fetchone()[0]
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items]
+            )
+            self._count += len(keys) - existing
+
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._count -= overflow
+
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove a single entry"""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount
+            self._count -= deleted
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._count
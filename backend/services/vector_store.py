@@ -0,0 +1,607 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import get_settings
+
+settings = get_settings()
+
+
+@dataclass
+class VectorMatch:
+    """A single search hit returned by a vector store"""
+    id: str
+    score: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class UpsertResult:
+    """Outcome of a batched upsert: how many vectors were written and which failed"""
+    upserted_count: int = 0
+    failed_ids: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    retries: int = 0
+
+
+class VectorStoreLockedError(RuntimeError):
+    """The local vector store directory is already open in another process"""
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an upsert error is worth retrying (network issues, throttling, 5xx)"""
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return False
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status != 429:
+        return False
+    return True
+
+
+class VectorStore(ABC):
+    """Interface shared by every vector-store backend.
+
+    Vectors are dicts of ``{"id", "values", "metadata"}`` (the Pinecone upsert
+    format) and filters use Pinecone's metadata filter syntax, restricted to
+    equality and ``$in``. Every operation is scoped to a namespace; ``None``
+    is the default namespace.
+    """
+
+    @abstractmethod
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ) -> List[VectorMatch]:
+        ...
+
+    @abstractmethod
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ):
+        ...
+
+    @abstractmethod
+    def fetch(self, ids: List[str], namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the stored vectors (id, values, metadata) among ids"""
+
+    @abstractmethod
+    def delete_namespace(self, namespace: str):
+        """Drop a namespace and every vector in it"""
+
+    async def upsert_batches(
+        self,
+        vectors: List[Dict[str, Any]],
+        batch_size: int = None,
+        concurrency: int = None,
+        max_retries: int = None,
+        retry_base_delay: float = None,
+        namespace: Optional[str] = None
+    ) -> UpsertResult:
+        """Upsert vectors in batches sent concurrently, retrying transient failures.
+
+        Each batch is retried with exponential backoff and full jitter; a batch
+        that still fails is reported in ``failed_ids`` instead of aborting the
+        remaining batches.
+        """
+        batch_size = batch_size or settings.VECTOR_UPSERT_BATCH_SIZE
+        concurrency = concurrency or settings.VECTOR_UPSERT_CONCURRENCY
+        max_retries = settings.VECTOR_UPSERT_MAX_RETRIES if max_retries is None else max_retries
+        retry_base_delay = settings.VECTOR_UPSERT_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+
+        result = UpsertResult()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upsert_batch(batch: List[Dict[str, Any]]):
+            async with semaphore:
+                for attempt in range(max_retries + 1):
+                    try:
+                        # The client calls block, so run them off the event loop
+                        await asyncio.to_thread(self.upsert, batch, namespace)
+                        result.upserted_count += len(batch)
+                        return
+                    except Exception as e:
+                        if attempt == max_retries or not _is_transient(e):
+                            print(f"Upsert of {len(batch)} vectors failed after {attempt + 1} attempt(s): {e}")
+                            result.failed_ids.extend(vector["id"] for vector in batch)
+                            result.errors.append(str(e))
+                            return
+                        result.retries += 1
+                        await asyncio.sleep(random.uniform(0, retry_base_delay * (2 ** attempt)))
+
+        await asyncio.gather(*(
+            upsert_batch(vectors[i:i + batch_size]) for i in range(0, len(vectors), batch_size)
+        ))
+        return result
+
+    @property
+    def is_ready(self) -> bool:
+        return True
+
+    def warm_up(self):
+        """Open any remote connection ahead of the first request"""
+        pass
+
+
+class PineconeVectorStore(VectorStore):
+    """Vector store backed by a Pinecone serverless index"""
+
+    def __init__(self, api_key: str, index_name: str, dimension: int):
+        from pinecone import Pinecone
+
+        self.pc = Pinecone(api_key=api_key)
+        self.index_name = index_name
+        self.dimension = dimension
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _ensure_index(self):
+        """Ensure the Pinecone index exists"""
+        from pinecone import ServerlessSpec
+
+        existing_indexes = [index.name for index in self.pc.list_indexes()]
+
+        if self.index_name not in existing_indexes:
+            self.pc.create_index(
+                name=self.index_name,
+                dimension=self.dimension,
+                metric='cosine',
+                spec=ServerlessSpec(
+                    cloud='aws',
+                    region='us-east-1'
+                )
+            )
+
+        return self.pc.Index(self.index_name)
+
+    @property
+    def index(self):
+        # Connect on first use and retry on later calls if Pinecone was unreachable,
+        # instead of disabling search for the lifetime of the process
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._ensure_index()
+        return self._index
+
+    @property
+    def is_ready(self) -> bool:
+        return self._index is not None
+
+    def warm_up(self):
+        self.index
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None):
+        self.index.upsert(vectors=vectors, namespace=namespace or "")
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ) -> List[VectorMatch]:
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            filter=filter or None,
+            namespace=namespace or ""
+        )
+        return [
+            VectorMatch(id=match.id, score=match.score, metadata=dict(match.metadata or {}))
+            for match in results.matches
+        ]
+
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ):
+        if ids:
+            self.index.delete(ids=ids, namespace=namespace or "")
+        elif filter:
+            self.index.delete(filter=filter, namespace=namespace or "")
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        response = self.index.fetch(ids=ids, namespace=namespace or "")
+        return [
+            {"id": vector.id, "values": list(vector.values), "metadata": dict(vector.metadata or {})}
+            for vector in response.vectors.values()
+        ]
+
+    def delete_namespace(self, namespace: str):
+        try:
+            self.index.delete(delete_all=True, namespace=namespace)
+        except Exception as e:
+            # Pinecone answers 404 for a namespace that was never written to
+            if getattr(e, "status", None) != 404:
+                raise
+
+
+class LocalVectorStore(VectorStore):
+    """In-process cosine-similarity index persisted to memory-mapped files.
+
+    Vectors live in a float32 memmap (``vectors.f32``) and ids/metadata in a
+    SQLite table (``index.sqlite3``), so a write only touches the rows it
+    changes. Rows are partitioned by namespace, so a query only touches its
+    own namespace's rows, and the common filter fields are mirrored into
+    NumPy columns so filtering those rows is a boolean mask plus one
+    matrix-vector product.
+
+    The id/row map is held in memory, so only one process may open a store
+    directory: opening it from a second one (e.g. another uvicorn worker)
+    raises ``VectorStoreLockedError``. Use Pinecone to serve from several workers.
+    """
+
+    # Integer metadata fields mirrored into NumPy columns for vectorised filtering
+    INT_FILTER_FIELDS = ("case_id", "meeting_id", "document_id")
+    MISSING = -1
+
+    def __init__(self, directory: str, dimension: int):
+        self.directory = directory
+        self.dimension = dimension
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.metadata_path = os.path.join(directory, "index.sqlite3")
+        self._lock = threading.RLock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = self._acquire_process_lock(os.path.join(directory, ".lock"))
+        self._db = sqlite3.connect(self.metadata_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "row INTEGER PRIMARY KEY, vector_id TEXT NOT NULL, namespace TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._db.commit()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _acquire_process_lock(path: str):
+        """Hold an exclusive lock on the store directory for the life of the process"""
+        lock_file = open(path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise VectorStoreLockedError(
+                f"Local vector store {os.path.dirname(path)} is already open in another process; "
+                "run a single worker or use VECTOR_STORE_BACKEND=pinecone"
+            )
+        return lock_file
+
+    def _load(self):
+        # Capacity is however many rows the vectors file holds
+        capacity = 0
+        if os.path.exists(self.vectors_path):
+            capacity = os.path.getsize(self.vectors_path) // (self.dimension * np.dtype(np.float32).itemsize)
+        self.ids: List[Optional[str]] = [None] * capacity
+        self.namespaces: List[Optional[str]] = [None] * capacity
+        self.metadata: List[Optional[Dict[str, Any]]] = [None] * capacity
+        for row, vector_id, namespace, metadata in self._db.execute(
+            "SELECT row, vector_id, namespace, metadata FROM vectors"
+        ):
+            if row < capacity:
+                self.ids[row] = vector_id
+                self.namespaces[row] = namespace
+                self.metadata[row] = json.loads(metadata)
+        # Rows past the last stored vector are appended to rather than listed as free
+        while self.ids and self.ids[-1] is None:
+            self.ids.pop()
+            self.namespaces.pop()
+            self.metadata.pop()
+
+        self._vectors = self._open_vectors(capacity)
+        self.id_to_row: Dict[Tuple[str, str], int] = {}
+        self.namespace_rows: Dict[str, Set[int]] = {}
+        self._namespace_arrays: Dict[str, np.ndarray] = {}
+        self.free_rows = []
+        for row, vector_id in enumerate(self.ids):
+            if vector_id is None:
+                self.free_rows.append(row)
+            else:
+                self._assign_row(self.namespaces[row], vector_id, row)
+
+        # Rebuild filter columns from metadata
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.int_columns = {name: np.full(capacity, self.MISSING, dtype=np.int64) for name in self.INT_FILTER_FIELDS}
+        self.type_codes: Dict[str, int] = {}
+        self.type_column = np.full(capacity, self.MISSING, dtype=np.int32)
+        for row, meta in enumerate(self.metadata):
+            if self.ids[row] is not None:
+                self._index_row(row, meta)
+
+    def _open_vectors(self, capacity: int) -> np.ndarray:
+        if capacity == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _grow(self, required: int):
+        capacity = len(self.alive)
+        if required <= capacity:
+            return
+
+        new_capacity = max(1024, capacity * 2, required)
+        new_vectors = np.memmap(
+            self.vectors_path + ".tmp", dtype=np.float32, mode="w+", shape=(new_capacity, self.dimension)
+        )
+        new_vectors[:capacity] = self._vectors[:capacity]
+        new_vectors.flush()
+        del new_vectors
+        self._vectors = None
+        os.replace(self.vectors_path + ".tmp", self.vectors_path)
+        self._vectors = self._open_vectors(new_capacity)
+
+        extra = new_capacity - capacity
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+        for name in self.INT_FILTER_FIELDS:
+            self.int_columns[name] = np.concatenate(
+                [self.int_columns[name], np.full(extra, self.MISSING, dtype=np.int64)]
+            )
+        self.type_column = np.concatenate([self.type_column, np.full(extra, self.MISSING, dtype=np.int32)])
+
+    def _save(self, rows: List[int]):
+        """Flush the vectors and persist the ids/metadata of the rows just written or freed"""
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+
+        with self._db:
+            self._db.executemany(
+                "DELETE FROM vectors WHERE row = ?",
+                [(row,) for row in rows if self.ids[row] is None]
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO vectors (row, vector_id, namespace, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (row, self.ids[row], self.namespaces[row], json.dumps(self.metadata[row]))
+                    for row in rows if self.ids[row] is not None
+                ]
+            )
+
+    # ------------------------------------------------------------------
+    # Namespaces and filter columns
+    # ------------------------------------------------------------------
+
+    def _assign_row(self, namespace: str, vector_id: str, row: int):
+        self.id_to_row[(namespace, vector_id)] = row
+        self.namespace_rows.setdefault(namespace, set()).add(row)
+        self._namespace_arrays.pop(namespace, None)
+
+    def _release_row(self, row: int):
+        namespace = self.namespaces[row]
+        del self.id_to_row[(namespace, self.ids[row])]
+        rows = self.namespace_rows[namespace]
+        rows.discard(row)
+        if not rows:
+            del self.namespace_rows[namespace]
+        self._namespace_arrays.pop(namespace, None)
+
+        self.ids[row] = None
+        self.namespaces[row] = None
+        self.metadata[row] = None
+        self.alive[row] = False
+        for name in self.INT_FILTER_FIELDS:
+            self.int_columns[name][row] = self.MISSING
+        self.type_column[row] = self.MISSING
+        self.free_rows.append(row)
+
+    def _rows_in(self, namespace: str) -> np.ndarray:
+        # Sorted row array per namespace, rebuilt only after that namespace changes
+        rows = self._namespace_arrays.get(namespace)
+        if rows is None:
+            rows = np.array(sorted(self.namespace_rows.get(namespace, ())), dtype=np.int64)
+            self._namespace_arrays[namespace] = rows
+        return rows
+
+    def _type_code(self, value: str, create: bool = False) -> Optional[int]:
+        if value not in self.type_codes and create:
+            self.type_codes[value] = len(self.type_codes)
+        return self.type_codes.get(value)
+
+    def _index_row(self, row: int, meta: Dict[str, Any]):
+        self.alive[row] = True
+        for name in self.INT_FILTER_FIELDS:
+            value = meta.get(name)
+            self.int_columns[name][row] = int(value) if value is not None else self.MISSING
+        content_type = meta.get("type")
+        self.type_column[row] = self._type_code(content_type, create=True) if content_type is not None else self.MISSING
+
+    def _filter_rows(self, rows: np.ndarray, filter: Optional[Dict[str, Any]]) -> np.ndarray:
+        if not filter or len(rows) == 0:
+            return rows
+
+        mask = np.ones(len(rows), dtype=bool)
+        for name, condition in filter.items():
+            if isinstance(condition, dict):
+                if "$eq" in condition:
+                    values = [condition["$eq"]]
+                elif "$in" in condition:
+                    values = list(condition["$in"])
+                else:
+                    raise ValueError(f"Unsupported filter operator for '{name}': {condition}")
+            else:
+                values = [condition]
+
+            if name in self.int_columns:
+                mask &= np.isin(self.int_columns[name][rows], [int(value) for value in values])
+            elif name == "type":
+                codes = [self._type_code(value) for value in values]
+                mask &= np.isin(self.type_column[rows], [code for code in codes if code is not None])
+            else:
+                # Uncommon fields fall back to a scan over the surviving rows
+                for i in np.flatnonzero(mask):
+                    if self.metadata[rows[i]].get(name) not in values:
+                        mask[i] = False
+        return rows[mask]
+
+    # ------------------------------------------------------------------
+    # VectorStore API
+    # ------------------------------------------------------------------
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None):
+        if not vectors:
+            return
+
+        namespace = namespace or ""
+        with self._lock:
+            new_count = sum(1 for vector in vectors if (namespace, vector["id"]) not in self.id_to_row)
+            self._grow(len(self.ids) + max(0, new_count - len(self.free_rows)))
+
+            written = []
+            for vector in vectors:
+                vector_id = vector["id"]
+                row = self.id_to_row.get((namespace, vector_id))
+                if row is None:
+                    if self.free_rows:
+                        row = self.free_rows.pop()
+                        self.ids[row] = vector_id
+                        self.namespaces[row] = namespace
+                        self.metadata[row] = None
+                    else:
+                        row = len(self.ids)
+                        self.ids.append(vector_id)
+                        self.namespaces.append(namespace)
+                        self.metadata.append(None)
+                    self._assign_row(namespace, vector_id, row)
+
+                values = np.asarray(vector["values"], dtype=np.float32)
+                norm = np.linalg.norm(values)
+                self._vectors[row] = values / norm if norm > 0 else values
+
+                meta = dict(vector.get("metadata") or {})
+                self.metadata[row] = meta
+                self._index_row(row, meta)
+                written.append(row)
+
+            self._save(written)
+
+    async def upsert_batches(
+        self,
+        vectors: List[Dict[str, Any]],
+        namespace: Optional[str] = None,
+        **kwargs
+    ) -> UpsertResult:
+        # Local writes are serialized by the lock, so a single call beats concurrent batches
+        try:
+            await asyncio.to_thread(self.upsert, vectors, namespace)
+        except Exception as e:
+            print(f"Local upsert of {len(vectors)} vectors failed: {e}")
+            return UpsertResult(failed_ids=[vector["id"] for vector in vectors], errors=[str(e)])
+        return UpsertResult(upserted_count=len(vectors))
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ) -> List[VectorMatch]:
+        with self._lock:
+            rows = self._filter_rows(self._rows_in(namespace or ""), filter)
+            if len(rows) == 0 or top_k <= 0:
+                return []
+
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+
+            scores = self._vectors[rows] @ query
+            if len(rows) > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+            else:
+                best = np.arange(len(rows))
+            best = best[np.argsort(-scores[best])]
+
+            return [
+                VectorMatch(
+                    id=self.ids[rows[i]],
+                    score=float(scores[i]),
+                    metadata=dict(self.metadata[rows[i]])
+                )
+                for i in best
+            ]
+
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ):
+        namespace = namespace or ""
+        with self._lock:
+            if ids:
+                rows = [
+                    self.id_to_row[(namespace, vector_id)]
+                    for vector_id in ids if (namespace, vector_id) in self.id_to_row
+                ]
+            elif filter:
+                rows = self._filter_rows(self._rows_in(namespace), filter).tolist()
+            else:
+                return
+
+            for row in rows:
+                self._release_row(row)
+
+            if rows:
+                self._save(rows)
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        namespace = namespace or ""
+        with self._lock:
+            rows = [self.id_to_row[(namespace, vector_id)] for vector_id in ids if (namespace, vector_id) in self.id_to_row]
+            return [
+                {"id": self.ids[row], "values": self._vectors[row].tolist(), "metadata": dict(self.metadata[row])}
+                for row in rows
+            ]
+
+    def delete_namespace(self, namespace: str):
+        with self._lock:
+            rows = list(self.namespace_rows.get(namespace, ()))
+            for row in rows:
+                self._release_row(row)
+            if rows:
+                self._save(rows)
+
+
+def case_namespace(case_id: int) -> str:
+    """Namespace holding a case's vectors when VECTOR_NAMESPACE_PER_CASE is enabled"""
+    return f"case-{case_id}"
+
+
+def create_vector_store(dimension: int) -> VectorStore:
+    """Build the vector store selected by VECTOR_STORE_BACKEND"""
+    backend = settings.VECTOR_STORE_BACKEND.lower()
+    if backend == "local":
+        return LocalVectorStore(settings.LOCAL_VECTOR_STORE_DIR, dimension)
+    if backend == "pinecone":
+        return PineconeVectorStore(settings.PINECONE_API_KEY, settings.PINECONE_INDEX_NAME, dimension)
+    raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {settings.VECTOR_STORE_BACKEND}")
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import get_settings
+
+settings = get_settings()
+
+
+class SearchBackend(ABC):
+    """Interface shared by web-search backends: results are dicts of ``{"title", "snippet", "link"}``"""
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        ...
+
+
+class DuckDuckGoSearchBackend(SearchBackend):
+    """DuckDuckGo through LangChain's community tool (blocking; run it in a thread)"""
+
+    name = "duckduckgo"
+
+    def __init__(self):
+        from langchain_community.tools import DuckDuckGoSearchResults
+
+        self._clients = {}
+        self._factory = DuckDuckGoSearchResults
+
+    def _client(self, max_results: int):
+        # One client per result count, reused across searches
+        client = self._clients.get(max_results)
+        if client is None:
+            client = self._clients[max_results] = self._factory(output_format="list", max_results=max_results)
+        return client
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        return self._client(max_results).invoke(query) or []
+
+
+class LocalSearchBackend(SearchBackend):
+    """Offline stand-in for tests and load tests.
+
+    Ranks the entries of a JSON fixture file (a list of ``{"title", "snippet",
+    "link"}``) by how many query words they contain; without fixtures it makes
+    up deterministic results from the query. ``latency_ms`` simulates the
+    round trip of a real search engine.
+    """
+
+    name = "local"
+
+    def __init__(self, fixtures_path: str = "", latency_ms: int = 0):
+        self.latency_ms = latency_ms
+        self.fixtures: List[Dict[str, str]] = []
+        if fixtures_path:
+            with open(fixtures_path, "r", encoding="utf-8") as f:
+                self.fixtures = json.load(f)
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        words = set(re.findall(r"\w+", query.lower()))
+        if self.fixtures:
+            scored = [
+                (len(words & set(re.findall(r"\w+", f"{entry.get('title', '')} {entry.get('snippet', '')}".lower()))), index)
+                for index, entry in enumerate(self.fixtures)
+            ]
+            ranked = sorted((item for item in scored if item[0]), key=lambda item: (-item[0], item[1]))
+            return [self.fixtures[index] for _, index in ranked[:max_results]]
+
+        slug = "-".join(re.findall(r"\w+", query.lower())) or "query"
+        return [
+            {
+                "title": f"Result {rank} for {query}",
+                "snippet": f"Offline search result {rank} about {query}.",
+                "link": f"https://search.local/{slug}/{rank}"
+            }
+            for rank in range(1, max_results + 1)
+        ]
+
+
+def create_search_backend() -> SearchBackend:
+    """Build the search backend selected by WEB_SEARCH_BACKEND"""
+    backend = settings.WEB_SEARCH_BACKEND.lower()
+    if backend == "duckduckgo":
+        return DuckDuckGoSearchBackend()
+    if backend == "local":
+        return LocalSearchBackend(settings.WEB_SEARCH_LOCAL_FIXTURES, settings.WEB_SEARCH_LOCAL_LATENCY_MS)
+    raise ValueError(f"Unknown WEB_SEARCH_BACKEND: {settings.WEB_SEARCH_BACKEND}")
+
+
+class SearchResultCache:
+    """Bounded in-memory LRU of search results that expire ``ttl_seconds`` after they were fetched"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, max_results: int) -> str:
+        # Case and whitespace don't change what a search engine returns
+        return f"{max_results}:{' '.join(query.lower().split())}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, results: List[Dict[str, str]]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def format_results(results: List[Dict[str, str]]) -> str:
+    """Render search results as the text handed back to the model"""
+    if not results:
+        return "No search results found."
+
+    formatted = "Web Search Results:\n\n"
+    for idx, result in enumerate(results, 1):
+        formatted += f"{idx}. {result.get('title', 'No title')}\n"
+        formatted += f"   {result.get('snippet', 'No snippet')}\n"
+        formatted += f"   Source: {result.get('link', 'No URL')}\n\n"
+    return formatted
+
+
+class WebSearchService:
+    """Cached web search for the chat tools.
+
+    Identical queries within WEB_SEARCH_CACHE_TTL_SECONDS are answered from
+    memory, and concurrent identical queries share one backend call. The
+    backend runs in a worker thread so the event loop never blocks on it.
+    """
+
+    def __init__(self):
+        # Built on first use so importing this module never touches the network client
+        self._backend: Optional[SearchBackend] = None
+        self.cache = SearchResultCache(settings.WEB_SEARCH_CACHE_MAX_ENTRIES, settings.WEB_SEARCH_CACHE_TTL_SECONDS)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.errors = 0
+
+    @property
+    def backend(self) -> SearchBackend:
+        if self._backend is None:
+            self._backend = create_search_backend()
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend: SearchBackend):
+        """Swap the backend (e.g. a LocalSearchBackend in tests)"""
+        self._backend = backend
+
+    def _fetch(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        key = SearchResultCache.key(query, max_results)
+        results = self.cache.get(key)
+        if results is None:
+            results = self.backend.search(query, max_results)
+            self.cache.set(key, results)
+        return results
+
+    def search_sync(self, query: str, max_results: int = None) -> str:
+        """Blocking search, formatted for the model"""
+        try:
+            return format_results(self._fetch(query, max_results or settings.WEB_SEARCH_MAX_RESULTS))
+        except Exception as e:
+            self.errors += 1
+            return f"Error performing web search: {str(e)}"
+
+    async def search(self, query: str, max_results: int = None) -> str:
+        """Search without blocking the event loop, formatted for the model"""
+        max_results = max_results or settings.WEB_SEARCH_MAX_RESULTS
+        key = SearchResultCache.key(query, max_results)
+        results = self.cache.get(key)
+        if results is not None:
+            return format_results(results)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        # What waiting callers get if this search is cancelled (e.g. by a tool timeout)
+        formatted = "Error performing web search: the search was cancelled"
+        try:
+            results = await asyncio.to_thread(self.backend.search, query, max_results)
+            self.cache.set(key, results)
+            formatted = format_results(results)
+        except Exception as e:
+            self.errors += 1
+            formatted = f"Error performing web search: {str(e)}"
+        finally:
+            self._in_flight.pop(key, None)
+            future.set_result(formatted)
+        return formatted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": settings.WEB_SEARCH_BACKEND if self._backend is None else self._backend.name,
+            "errors": self.errors,
+            "cache": self.cache.stats()
+        }
+
+
+# Singleton instance
+web_search_service = WebSearchService()
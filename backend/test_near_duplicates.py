@@ -0,0 +1,110 @@
+"""
+Tests for near-duplicate chunk handling in PineconeService (NEAR_DUPLICATE_MODE)
+
+Runs against the local vector store and a throwaway SQLite database in a
+temporary directory, with a bag-of-words encoder standing in for the
+embedding model. Run from the backend directory:
+    python -m pytest test_near_duplicates.py
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+
+from config import get_settings
+from database import Base, SessionLocal
+from services.chunk_manifest import chunk_manifest
+from services.pinecone_service import PineconeService
+
+settings = get_settings()
+
+BOILERPLATE = (
+    "The parties agree that all confidential information exchanged during discovery "
+    "shall be used solely for the purposes of this litigation and shall not be disclosed "
+    "to any third party without the prior written consent of the producing party. "
+    "Documents designated as confidential must be returned or destroyed within thirty days "
+    "of the final disposition of this action, and counsel shall certify compliance in writing."
+)
+
+
+class BagOfWordsEncoder:
+    """Deterministic stand-in for the sentence-transformers model"""
+
+    def encode(self, texts, batch_size=None, convert_to_tensor=False):
+        single = isinstance(texts, str)
+        vectors = np.zeros((1 if single else len(texts), 384), dtype=np.float32)
+        for row, text in enumerate([texts] if single else texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % 384] += 1
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch):
+    """Build a PineconeService whose stores all live under tmp_path"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setitem(SessionLocal.kw, "bind", engine)
+
+    def build(mode: str) -> PineconeService:
+        for name, value in {
+            "VECTOR_STORE_BACKEND": "local",
+            "LOCAL_VECTOR_STORE_DIR": str(tmp_path / "vector_store"),
+            "VECTOR_NAMESPACE_PER_CASE": False,
+            "EMBEDDING_CACHE_ENABLED": False,
+            "LEXICAL_INDEX_PATH": str(tmp_path / "lexical_index.sqlite3"),
+            "CHUNK_STORE_PATH": str(tmp_path / "chunk_store.sqlite3"),
+            "NEAR_DUPLICATE_INDEX_PATH": str(tmp_path / "near_duplicates.sqlite3"),
+            "NEAR_DUPLICATE_MODE": mode,
+        }.items():
+            monkeypatch.setattr(settings, name, value)
+        service = PineconeService()
+        service._model = BagOfWordsEncoder()
+        return service
+
+    return build
+
+
+def stored_ids(service: PineconeService):
+    return {vector_id for _, vector_id in service.index.id_to_row}
+
+
+def test_alias_on_ingest(make_service):
+    service = make_service("alias")
+    asyncio.run(service.store_case_document(1, 1, BOILERPLATE, {"title": "Protective Order"}))
+    stats = asyncio.run(service.store_case_document(2, 1, BOILERPLATE, {"title": "Stipulated Order"}))
+
+    canonical = chunk_manifest.get_chunks("document", 1)
+    aliases = chunk_manifest.get_chunks("document", 2)
+    assert canonical and stats["duplicates"] == len(aliases) == len(canonical)
+    assert [chunk["alias_of"] for chunk in aliases] == [chunk["id"] for chunk in canonical]
+    # Aliases point at the existing vectors instead of storing their own
+    assert stored_ids(service) == {chunk["id"] for chunk in canonical}
+
+
+def test_canonical_delete_promotes_alias(make_service):
+    service = make_service("alias")
+    asyncio.run(service.store_case_document(1, 1, BOILERPLATE, {"title": "Protective Order"}))
+    asyncio.run(service.store_case_document(2, 1, BOILERPLATE, {"title": "Stipulated Order"}))
+
+    asyncio.run(service.delete_case_document(1))
+
+    promoted = chunk_manifest.get_chunks("document", 2)
+    assert promoted and all(chunk["alias_of"] is None for chunk in promoted)
+    assert stored_ids(service) == {chunk["id"] for chunk in promoted}
+    # The heir's vector carries its own owner's metadata
+    vector = service.index.fetch([promoted[0]["id"]])[0]
+    assert vector["metadata"]["document_id"] == 2
+    assert chunk_manifest.get_chunks("document", 1) == []
+
+
+def test_skip_mode_drops_duplicates(make_service):
+    service = make_service("skip")
+    asyncio.run(service.store_case_document(1, 1, BOILERPLATE, {"title": "Protective Order"}))
+    stats = asyncio.run(service.store_case_document(2, 1, BOILERPLATE, {"title": "Stipulated Order"}))
+
+    assert stats["dedup_mode"] == "skip"
+    assert stats["duplicates"] == stats["total_chunks"] > 0
+    assert chunk_manifest.get_chunks("document", 2) == []
+    assert stored_ids(service) == set(chunk_manifest.get_vector_ids("document", 1))